@@ -0,0 +1,198 @@
+"""Physical state of every object in the game world, stored as numpy columns and integrated in bulk"""
+from typing import Any
+import numpy as np
+from physics.physics_object import physics_object, rect_collider
+from physics.orbits import gravity_acceleration, propagate_kepler
+from .component_table import component_table, column_allocator
+
+_VECTOR_COLUMNS = ("position", "velocity")
+
+
+class body_state(component_table):
+    """Position, velocity, rotation, mass and accumulated force of every object in the game world.
+
+    Spawned objects are attached to their row (see `physics_object.attach_storage`),
+    so reading `obj.position` still works, but the arrays here are the source of truth.
+
+    With a central planet (gravitational_parameter > 0) the world is in orbit mode:
+    bodies without any force applied this tick coast along their exact two-body orbit,
+    only bodies with a force applied are integrated numerically.
+
+    The position column is relative to a floating `origin`, kept in float64, which `rebase` moves around.
+    Everything outside the table (`get`/`set`, and so `obj.position`) sees world coordinates.
+    With float32 columns this keeps full precision near the action however big the world is,
+    anything that only looks at differences between positions (collisions) can use the column as is.
+    """
+    def __init__(self,
+                 gravitational_parameter:float = 0.0,
+                 dtype:np.dtype | type = np.float64,
+                 allocator:column_allocator | None = None):
+        """Body state table
+
+        Args:
+            gravitational_parameter (float, optional): G * M of the central planet at the origin, 0 for no planet. Defaults to 0.0.
+            dtype (np.dtype | type, optional): float type of every column, np.float32 halves the memory traffic. Defaults to np.float64.
+            allocator (column_allocator | None, optional): where to put the columns, see `component_table`. Defaults to None.
+        """
+        super().__init__({
+            "position": (dtype, (2,)), # relative to `origin`
+            "velocity": (dtype, (2,)),
+            "rotation": (dtype, ()),
+            "mass": (dtype, ()),
+            "force": (dtype, (2,)), # accumulated over a tick, cleared by `integrate`
+            "radius": (dtype, ()), # bounding radius of the collider
+            "extent": (dtype, (2,)), # (width, height) of rectangular colliders, (0, 0) for circles
+        }, allocator=allocator)
+        self.gravitational_parameter = gravitational_parameter
+        self.origin = np.zeros(2, dtype=np.float64)
+        '''world position of the position column's (0, 0), always float64'''
+        self._objects:list[physics_object] = []
+
+    @property
+    def orbit_mode(self) -> bool:
+        """whether there's a central planet pulling everything towards the origin"""
+        return self.gravitational_parameter > 0
+
+    def init_row(self, obj:physics_object, row:int):
+        """move a freshly spawned object's state into its row
+
+        Args:
+            obj (physics_object): the new object
+            row (int): its row
+        """
+        obj.attach_storage(self, row)
+        self._objects.append(obj)
+        self._columns["radius"][row] = obj.collider.radius
+        if isinstance(obj.collider, rect_collider):
+            self._columns["extent"][row] = (obj.collider.width, obj.collider.height)
+
+    def on_despawn(self, obj:physics_object, row:int, last_row:int):
+        """hand the state back to the object before its row is overwritten
+
+        Args:
+            obj (physics_object): the object being removed
+            row (int): its row
+            last_row (int): the current last row, which will take its place
+        """
+        obj.detach_storage()
+        super().on_despawn(obj, row, last_row)
+        moved = self._objects.pop()
+        if moved is not obj:
+            self._objects[row] = moved
+            moved.move_storage_row(row)
+
+    def get(self, row:int, name:str) -> Any:
+        """read a single value, vectors as (x, y) tuples, see `physics_object.body_storage`
+
+        Args:
+            row (int): row to read
+            name (str): column to read
+
+        Returns:
+            Any: the value
+        """
+        if name == "position":
+            return tuple((self._columns[name][row] + self.origin).tolist())
+        if name in _VECTOR_COLUMNS:
+            return tuple(self._columns[name][row].tolist())
+        return float(self._columns[name][row])
+
+    def set(self, row:int, name:str, value:Any):
+        """write a single value, vectors as (x, y) tuples, see `physics_object.body_storage`
+
+        Args:
+            row (int): row to write
+            name (str): column to write
+            value (Any): the value
+        """
+        if name == "position":
+            value = np.asarray(value, dtype=np.float64) - self.origin
+        self._columns[name][row] = value
+
+    def add_force(self, row:int, force:tuple[float, float]):
+        """apply a force (newtons) to a body for the rest of this tick
+
+        Args:
+            row (int): row of the body
+            force (tuple[float, float]): force in world coordinates
+        """
+        self._columns["force"][row] += force
+
+    def integrate(self, time_delta:float):
+        """advance every body by one tick, then clear the accumulated forces
+
+        Args:
+            time_delta (float): time since last update in seconds
+        """
+        integrate_bodies(self.column("position"), self.column("velocity"), self.column("force"), self.column("mass"),
+                         time_delta, gravitational_parameter=self.gravitational_parameter, origin=self.origin)
+
+    def propagate(self, duration:float):
+        """jump every body ahead in one go, as if no forces were applied the whole time
+
+        In orbit mode this is exact no matter how long `duration` is,
+        otherwise bodies just drift in a straight line.
+
+        Args:
+            duration (float): how far ahead to jump, in seconds
+        """
+        position = self.column("position")
+        velocity = self.column("velocity")
+        if self.orbit_mode:
+            planet_relative, velocity[:] = propagate_kepler(
+                position + self.origin, velocity, self.gravitational_parameter, duration)
+            position[:] = planet_relative - self.origin
+        else:
+            position += velocity * duration
+
+    def rebase(self, new_origin:tuple[float, float] | np.ndarray):
+        """move the floating origin, shifting every stored position so world positions stay the same
+
+        Args:
+            new_origin (tuple[float, float] | np.ndarray): new world position of the position column's (0, 0)
+        """
+        new_origin = np.array(new_origin, dtype=np.float64)
+        self.column("position")[:] -= new_origin - self.origin # the shift is float64, so this is computed in float64
+        self.origin = new_origin
+
+
+def integrate_bodies(position:np.ndarray, # pylint: disable=too-many-arguments
+                     velocity:np.ndarray,
+                     force:np.ndarray,
+                     mass:np.ndarray,
+                     time_delta:float,
+                     *,
+                     gravitational_parameter:float = 0.0,
+                     origin:np.ndarray | tuple[float, float] = (0.0, 0.0)):
+    """advance bodies by one tick in place, then clear their forces, see `body_state.integrate`
+
+    Every body is integrated on its own, so integrating any subset of rows gives exactly the same
+    result for those rows as integrating all of them.
+
+    Args:
+        position (np.ndarray): (n, 2) positions relative to `origin`
+        velocity (np.ndarray): (n, 2) velocities
+        force (np.ndarray): (n, 2) forces accumulated this tick
+        mass (np.ndarray): (n,) masses
+        time_delta (float): time since last update in seconds
+        gravitational_parameter (float, optional): G * M of the planet at the world origin, 0 for none. Defaults to 0.0.
+        origin (np.ndarray | tuple[float, float], optional): world position of the positions' (0, 0). Defaults to (0.0, 0.0).
+    """
+    origin = np.asarray(origin, dtype=np.float64)
+    forced = np.flatnonzero(np.any(force != 0, axis=1))
+    if gravitational_parameter > 0:
+        # orbits are worked out in float64 relative to the planet, then shifted back to the origin
+        coasting = np.flatnonzero(np.all(force == 0, axis=1))
+        if len(coasting) > 0:
+            planet_relative, velocity[coasting] = propagate_kepler(
+                position[coasting] + origin, velocity[coasting], gravitational_parameter, time_delta)
+            position[coasting] = planet_relative - origin
+        # semi-implicit euler for anything under thrust (or any other force)
+        acceleration = gravity_acceleration(position[forced] + origin, gravitational_parameter) \
+            + force[forced] / mass[forced, None]
+        velocity[forced] += acceleration * time_delta
+        position[forced] += velocity[forced] * time_delta
+    else:
+        velocity[forced] += force[forced] / mass[forced, None] * time_delta
+        position += velocity * time_delta
+    force[:] = 0
@@ -0,0 +1,118 @@
+"""Per-object numpy columns that stay row-aligned with the game world's dense object list"""
+from typing import Protocol
+import numpy as np
+from physics.physics_object import physics_object
+
+class column_allocator(Protocol):
+    """Where a component table's columns live, e.g. shared memory that other processes can map
+    """
+    def allocate(self, shape:tuple[int, ...], dtype:np.dtype | type) -> np.ndarray:
+        """a new zeroed array"""
+    def release(self, array:np.ndarray):
+        """`array` (from `allocate`) is no longer used by the table"""
+
+
+class component_table:
+    """Base class for state stored as numpy columns instead of on the objects themselves.
+
+    Row `i` of every column belongs to `game_world.physics_objects[i]`, the game world keeps the rows
+    aligned by calling `on_spawn`/`on_despawn` (a despawn moves the last row into the hole, exactly like the object list).
+    Systems then update every object in one vectorized pass over `column(name)`.
+    """
+    def __init__(self,
+                 columns:dict[str, tuple[np.dtype | type, tuple[int, ...]]],
+                 initial_capacity:int = 64,
+                 allocator:column_allocator | None = None):
+        """Component table
+
+        Args:
+            columns (dict[str, tuple[np.dtype | type, tuple[int, ...]]]): column name -> (dtype, per-row shape)
+            initial_capacity (int, optional): rows to allocate up front, grows by doubling. Defaults to 64.
+            allocator (column_allocator | None, optional): where to put the columns, None for plain numpy arrays. Defaults to None.
+        """
+        self.count = 0
+        '''number of live rows'''
+        self.capacity = initial_capacity
+        self._allocator = allocator
+        self._columns:dict[str, np.ndarray] = {
+            name: self._allocate((initial_capacity, *shape), dtype)
+            for name, (dtype, shape) in columns.items()
+        }
+
+    def column(self, name:str) -> np.ndarray:
+        """view of the live rows of a column, writes go straight into the table
+
+        Args:
+            name (str): column name
+
+        Returns:
+            np.ndarray: view of shape (count, *row_shape)
+        """
+        return self._columns[name][:self.count]
+
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        """names of every column in this table"""
+        return tuple(self._columns)
+
+    def column_array(self, name:str) -> np.ndarray:
+        """the whole allocated array of a column, including the unused rows past `count`,
+        it is replaced by a bigger one whenever the table grows
+
+        Args:
+            name (str): column name
+
+        Returns:
+            np.ndarray: array of shape (capacity, *row_shape)
+        """
+        return self._columns[name]
+
+    def _allocate(self, shape:tuple[int, ...], dtype:np.dtype | type) -> np.ndarray:
+        if self._allocator is None:
+            return np.zeros(shape, dtype=dtype)
+        return self._allocator.allocate(shape, dtype)
+
+    def _grow(self, min_capacity:int):
+        new_capacity = max(min_capacity, self.capacity * 2)
+        for name, array in self._columns.items():
+            grown = self._allocate((new_capacity, *array.shape[1:]), array.dtype)
+            grown[:self.count] = array[:self.count]
+            self._columns[name] = grown
+            if self._allocator is not None:
+                self._allocator.release(array)
+        self.capacity = new_capacity
+
+    def on_spawn(self, obj:physics_object, row:int):
+        """called by the game world when an object is appended at `row` (always the last row)
+
+        Args:
+            obj (physics_object): the new object
+            row (int): its row
+        """
+        if row >= self.capacity:
+            self._grow(row + 1)
+        self.count = row + 1
+        for array in self._columns.values():
+            array[row] = 0
+        self.init_row(obj, row)
+
+    def on_despawn(self, obj:physics_object, row:int, last_row:int): # pylint: disable=unused-argument
+        """called by the game world right before an object is removed, the last row is moved into its row
+
+        Args:
+            obj (physics_object): the object being removed
+            row (int): its row
+            last_row (int): the current last row, which will take its place
+        """
+        if row != last_row:
+            for array in self._columns.values():
+                array[row] = array[last_row]
+        self.count = last_row
+
+    def init_row(self, obj:physics_object, row:int):
+        """fill in the row of a freshly spawned object, every column is zeroed beforehand
+
+        Args:
+            obj (physics_object): the new object
+            row (int): its row
+        """
@@ -1,11 +1,13 @@
 '''Configuration classes for the game.'''
 from .game_configuration import game_config, player_config
 from .ship_configuration import ship_config
+from .genome_archive import genome_archive
 from . import ship_presets
 
 __all__ = [
     "game_config",
     "player_config",
     "ship_config",
+    "genome_archive",
     "ship_presets",
 ]
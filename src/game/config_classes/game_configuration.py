@@ -12,7 +12,7 @@ class player_config:
     fleet: list[ship_config]
 
 @dataclass
-class game_config:
+class game_config: # pylint: disable=too-many-instance-attributes
     """Stores configuration data for an instance of the game
     """
     # general configuration
@@ -26,3 +26,27 @@ class game_config:
     asteroid_amount: int
     asteroid_size_mean: float
     asteroid_size_stddev: float
+
+    # orbit mode, rounds take place around a planet at the origin, leave the mass at 0 for open space
+    planet_mass: float = 0.0 # kg
+    planet_radius: float = 0.0 # m
+
+    # precision of the physics state, float32 halves its memory traffic,
+    # positions are then stored relative to a floating origin that follows the ships around
+    float32_state: bool = False
+    rebase_interval: int = 1000 # ticks between moving the floating origin, only used with float32_state
+
+    # collision response, with 0 solver iterations everything passes through everything
+    solver_iterations: int = 8
+    restitution: float = 0.3 # 0 for no bounce, 1 for perfectly elastic
+    friction: float = 0.2
+    impact_damage: float = 1e-3 # ship health lost per newton second of impulse it takes to stop an impact
+    impact_speed_threshold: float = 1.0 # m/s, contacts closing slower than this (resting, pushing) deal no damage
+
+    # threads for running independent systems of an update at the same time, 1 to run them one after another
+    system_threads: int = 1
+
+    # worker processes for stepping the world region by region, 0 to step it in this process,
+    # only worth it for very large worlds, results are exactly the same either way
+    shard_workers: int = 0
+    shard_tile_size: float = 1000.0 # m, side length of the regions, a few times the biggest body
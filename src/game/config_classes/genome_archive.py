@@ -0,0 +1,360 @@
+"""Append-only, memory-mapped archive of player configurations (genomes) for genetic algorithm runs
+
+An archive is a directory holding two fixed-width record files:
+
+- ``genomes.bin``: one small record per player configuration, holding the lineage and fitness
+  metadata plus the position of its fleet in the ship file. This is the "index" of the archive,
+  queries only ever touch this file.
+- ``ships.bin``: one record per ship configuration, fleets are stored contiguously.
+
+Both files start with a 16 byte header (magic, schema version, record size) followed by raw records,
+so they can be appended to with a plain file write and read back with ``numpy.memmap``.
+"""
+import dataclasses
+import os
+import numpy as np
+from .ship_configuration import ship_config
+from .game_configuration import player_config
+
+ARCHIVE_SCHEMA_VERSION = 1
+'''bump this whenever either record dtype changes, old archives will refuse to open'''
+
+SHIP_RECORD_FIELDS = (
+    "mass",
+    "rotation_acceleration",
+    "max_rotation_speed",
+    "width",
+    "length",
+    "forward_thrust",
+    "backward_thrust",
+    "right_strafe_thrust",
+    "left_strafe_thrust",
+    "max_health",
+    "heat_dissipation",
+    "heat_capacity",
+    "module_capacity",
+)
+if SHIP_RECORD_FIELDS != tuple(field.name for field in dataclasses.fields(ship_config)):
+    # the archive format is fixed-width, so it can't silently follow the dataclass around
+    raise TypeError("ship_config fields changed, update SHIP_RECORD_FIELDS and bump ARCHIVE_SCHEMA_VERSION")
+
+SHIP_RECORD_DTYPE = np.dtype([(name, "<f8") for name in SHIP_RECORD_FIELDS])
+'''one ship_config, every field stored as a little-endian float64'''
+
+GENOME_RECORD_DTYPE = np.dtype([
+    ("genome_id", "<i8"),
+    ("generation", "<i4"),
+    ("fleet_size", "<i4"),
+    ("parent_a", "<i8"), # -1 if there is no parent
+    ("parent_b", "<i8"), # -1 if there is no parent
+    ("fitness", "<f8"), # NaN until the genome has been evaluated
+    ("initial_direction", "<f8"),
+    ("initial_velocity", "<f8"),
+    ("budget", "<i8"),
+    ("fleet_start", "<i8"), # index of the first ship record of this genome's fleet
+])
+'''one player_config, plus the lineage and fitness metadata used to query the archive'''
+
+_MAGIC = b"ORBGENOM"
+_HEADER_DTYPE = np.dtype([("magic", "S8"), ("schema_version", "<u4"), ("record_size", "<u4")])
+_HEADER_SIZE = _HEADER_DTYPE.itemsize
+
+
+def ship_configs_to_records(configs:list[ship_config]) -> np.ndarray:
+    """convert a list of ship configs into an array of ship records
+
+    Args:
+        configs (list[ship_config]): ship configs to convert
+
+    Returns:
+        np.ndarray: array of SHIP_RECORD_DTYPE, one record per config
+    """
+    records = np.empty(len(configs), dtype=SHIP_RECORD_DTYPE)
+    for name in SHIP_RECORD_FIELDS:
+        records[name] = [getattr(config, name) for config in configs]
+    return records
+
+def records_to_ship_configs(records:np.ndarray) -> list[ship_config]:
+    """convert an array of ship records back into ship configs
+
+    Args:
+        records (np.ndarray): array of SHIP_RECORD_DTYPE
+
+    Returns:
+        list[ship_config]: one ship config per record
+    """
+    columns = [records[name].tolist() for name in SHIP_RECORD_FIELDS]
+    return [ship_config(*values) for values in zip(*columns)]
+
+
+class genome_archive:
+    """Append-only archive of player configurations, memory-mapped for random access.
+
+    Genome IDs are the record index in the archive, so lookups by ID are O(1).
+    Everything but the fitness column is write-once, fitness can be filled in after evaluation.
+    """
+    def __init__(self, directory:str, writable:bool = True):
+        """Open (or create) an archive
+
+        Args:
+            directory (str): directory holding the archive files, created if it doesn't exist and writable is set
+            writable (bool, optional): whether genomes can be appended and fitness written. Defaults to True.
+        """
+        self.directory = directory
+        self.writable = writable
+        self._genome_path = os.path.join(directory, "genomes.bin")
+        self._ship_path = os.path.join(directory, "ships.bin")
+        if writable:
+            os.makedirs(directory, exist_ok=True)
+        for path, dtype in ((self._genome_path, GENOME_RECORD_DTYPE), (self._ship_path, SHIP_RECORD_DTYPE)):
+            if not os.path.exists(path):
+                if not writable:
+                    raise FileNotFoundError(f"no genome archive at {directory}")
+                _write_header(path, dtype)
+            _check_header(path, dtype)
+            if writable:
+                _drop_torn_record(path, dtype)
+        # memory maps are re-opened lazily whenever the files grow
+        self._genome_view:np.ndarray = np.empty(0, dtype=GENOME_RECORD_DTYPE)
+        self._ship_view:np.ndarray = np.empty(0, dtype=SHIP_RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return _record_count(self._genome_path, GENOME_RECORD_DTYPE)
+
+    @property
+    def genomes(self) -> np.ndarray:
+        """memory-mapped view of every genome record, indexable by genome ID"""
+        count = len(self)
+        if len(self._genome_view) != count:
+            self._genome_view = _open_records(self._genome_path, GENOME_RECORD_DTYPE, count,
+                                              "r+" if self.writable else "r")
+        return self._genome_view
+
+    @property
+    def ships(self) -> np.ndarray:
+        """memory-mapped view of every ship record"""
+        count = _record_count(self._ship_path, SHIP_RECORD_DTYPE)
+        if len(self._ship_view) != count:
+            self._ship_view = _open_records(self._ship_path, SHIP_RECORD_DTYPE, count, "r")
+        return self._ship_view
+
+    def append(self,
+               config:player_config,
+               generation:int,
+               parents:tuple[int, int] = (-1, -1),
+               fitness:float = float("nan")) -> int:
+        """append a single player config to the archive
+
+        Args:
+            config (player_config): config to store
+            generation (int): generation this genome belongs to
+            parents (tuple[int, int], optional): genome IDs of the parents, -1 for none. Defaults to (-1, -1).
+            fitness (float, optional): fitness, if already known. Defaults to NaN (not evaluated).
+
+        Returns:
+            int: genome ID of the new genome
+        """
+        return int(self.append_many([config], generation, [parents], [fitness])[0])
+
+    def append_many(self,
+                    configs:list[player_config],
+                    generation:int,
+                    parents:list[tuple[int, int]] | None = None,
+                    fitness:list[float] | None = None) -> np.ndarray:
+        """append a whole population in one write
+
+        Args:
+            configs (list[player_config]): configs to store
+            generation (int): generation these genomes belong to
+            parents (list[tuple[int, int]] | None, optional): parent IDs per config. Defaults to no parents.
+            fitness (list[float] | None, optional): fitness per config. Defaults to NaN (not evaluated).
+
+        Returns:
+            np.ndarray: genome IDs of the new genomes, in the same order as `configs`
+        """
+        if not self.writable:
+            raise PermissionError("genome archive was opened read-only")
+        # appending after a torn record would shift every later record, so cut it off first
+        first_id = _drop_torn_record(self._genome_path, GENOME_RECORD_DTYPE)
+        first_ship = _drop_torn_record(self._ship_path, SHIP_RECORD_DTYPE)
+        fleet_sizes = np.array([len(config.fleet) for config in configs], dtype=np.int64)
+
+        genome_records = np.zeros(len(configs), dtype=GENOME_RECORD_DTYPE)
+        genome_records["genome_id"] = np.arange(first_id, first_id + len(configs))
+        genome_records["generation"] = generation
+        genome_records["fleet_size"] = fleet_sizes
+        genome_records["parent_a"], genome_records["parent_b"] = \
+            np.array(parents if parents is not None else [(-1, -1)] * len(configs), dtype=np.int64).reshape(-1, 2).T
+        genome_records["fitness"] = fitness if fitness is not None else np.nan
+        genome_records["initial_direction"] = [config.initial_direction for config in configs]
+        genome_records["initial_velocity"] = [config.initial_velocity for config in configs]
+        genome_records["budget"] = [config.budget for config in configs]
+        genome_records["fleet_start"] = first_ship + np.cumsum(fleet_sizes) - fleet_sizes
+        ship_records = ship_configs_to_records([ship for config in configs for ship in config.fleet])
+
+        # ships go first, a crash between the two writes leaves unreferenced ships rather than broken genomes
+        with open(self._ship_path, "ab") as file:
+            file.write(ship_records.tobytes())
+        with open(self._genome_path, "ab") as file:
+            file.write(genome_records.tobytes())
+        return genome_records["genome_id"]
+
+    def set_fitness(self, genome_ids:int | np.ndarray, fitness:float | np.ndarray):
+        """write the fitness of already-archived genomes, the only in-place edit the archive allows
+
+        Args:
+            genome_ids (int | np.ndarray): genome ID(s) to update
+            fitness (float | np.ndarray): fitness value(s), broadcast against `genome_ids`
+        """
+        if not self.writable:
+            raise PermissionError("genome archive was opened read-only")
+        self.genomes["fitness"][genome_ids] = fitness
+
+    def flush(self):
+        """flush any in-place fitness writes to disk"""
+        if isinstance(self._genome_view, np.memmap):
+            self._genome_view.flush()
+
+    def get(self, genome_id:int) -> player_config:
+        """rebuild the player config of a genome
+
+        Args:
+            genome_id (int): ID of the genome
+
+        Returns:
+            player_config: a fresh player config, equal to the one that was appended
+        """
+        record = self.genomes[genome_id]
+        return player_config(
+            initial_direction=float(record["initial_direction"]),
+            initial_velocity=float(record["initial_velocity"]),
+            budget=int(record["budget"]),
+            fleet=records_to_ship_configs(self.fleet_records(genome_id)),
+        )
+
+    def fleet_records(self, genome_id:int) -> np.ndarray:
+        """ship records of a genome's fleet, without converting them to ship configs
+
+        Args:
+            genome_id (int): ID of the genome
+
+        Returns:
+            np.ndarray: memory-mapped slice of SHIP_RECORD_DTYPE
+        """
+        record = self.genomes[genome_id]
+        start = int(record["fleet_start"])
+        return self.ships[start:start + int(record["fleet_size"])]
+
+    def select(self,
+               generation:int | None = None,
+               min_fitness:float | None = None,
+               evaluated:bool | None = None) -> np.ndarray:
+        """find genomes matching some metadata, only reads the genome index
+
+        Args:
+            generation (int | None, optional): only genomes from this generation. Defaults to any.
+            min_fitness (float | None, optional): only genomes with at least this fitness. Defaults to any.
+            evaluated (bool | None, optional): only genomes with (True) or without (False) a fitness. Defaults to any.
+
+        Returns:
+            np.ndarray: matching genome IDs, ascending
+        """
+        genomes = self.genomes
+        mask = np.ones(len(genomes), dtype=bool)
+        if generation is not None:
+            mask &= genomes["generation"] == generation
+        if min_fitness is not None:
+            mask &= genomes["fitness"] >= min_fitness
+        if evaluated is not None:
+            mask &= np.isnan(genomes["fitness"]) != evaluated
+        return np.flatnonzero(mask)
+
+    def top(self, amount:int, generation:int | None = None) -> np.ndarray:
+        """the fittest genomes, ignoring any that haven't been evaluated
+
+        Args:
+            amount (int): how many genomes to return at most
+            generation (int | None, optional): only consider this generation. Defaults to all generations.
+
+        Returns:
+            np.ndarray: genome IDs, fittest first
+        """
+        candidates = self.select(generation=generation, evaluated=True)
+        fitness = self.genomes["fitness"][candidates]
+        if amount < len(candidates):
+            best = np.argpartition(-fitness, amount - 1)[:amount]
+            candidates, fitness = candidates[best], fitness[best]
+        return candidates[np.argsort(-fitness, kind="stable")]
+
+    def children(self, genome_id:int) -> np.ndarray:
+        """genomes that have `genome_id` as a parent
+
+        Args:
+            genome_id (int): ID of the parent
+
+        Returns:
+            np.ndarray: child genome IDs, ascending
+        """
+        genomes = self.genomes
+        return np.flatnonzero((genomes["parent_a"] == genome_id) | (genomes["parent_b"] == genome_id))
+
+    def lineage(self, genome_id:int, max_depth:int = -1) -> list[int]:
+        """every ancestor of a genome, breadth first, without duplicates
+
+        Args:
+            genome_id (int): ID of the genome to trace
+            max_depth (int, optional): how many generations back to go, -1 for all. Defaults to -1.
+
+        Returns:
+            list[int]: ancestor genome IDs, closest first
+        """
+        genomes = self.genomes
+        ancestors:list[int] = []
+        seen = {genome_id}
+        frontier = [genome_id]
+        depth = 0
+        while frontier and depth != max_depth:
+            parents = genomes[["parent_a", "parent_b"]][frontier]
+            frontier = []
+            for parent in (*parents["parent_a"].tolist(), *parents["parent_b"].tolist()):
+                if parent >= 0 and parent not in seen:
+                    seen.add(parent)
+                    frontier.append(parent)
+                    ancestors.append(parent)
+            depth += 1
+        return ancestors
+
+
+def _write_header(path:str, dtype:np.dtype):
+    header = np.array([(_MAGIC, ARCHIVE_SCHEMA_VERSION, dtype.itemsize)], dtype=_HEADER_DTYPE)
+    with open(path, "wb") as file:
+        file.write(header.tobytes())
+
+def _check_header(path:str, dtype:np.dtype):
+    with open(path, "rb") as file:
+        raw = file.read(_HEADER_SIZE)
+    if len(raw) != _HEADER_SIZE:
+        raise ValueError(f"{path} is not a genome archive file (truncated header)")
+    header = np.frombuffer(raw, dtype=_HEADER_DTYPE)[0]
+    if header["magic"] != _MAGIC:
+        raise ValueError(f"{path} is not a genome archive file")
+    if header["schema_version"] != ARCHIVE_SCHEMA_VERSION or header["record_size"] != dtype.itemsize:
+        raise ValueError(f"{path} uses archive schema version {header['schema_version']}, "
+                         f"expected {ARCHIVE_SCHEMA_VERSION}")
+
+def _record_count(path:str, dtype:np.dtype) -> int:
+    # a partially written trailing record (crash mid-append) isn't counted, `_drop_torn_record` removes it
+    return (os.path.getsize(path) - _HEADER_SIZE) // dtype.itemsize
+
+def _drop_torn_record(path:str, dtype:np.dtype) -> int:
+    """truncate a record file to a whole number of records, returns the number of records"""
+    count = _record_count(path, dtype)
+    if os.path.getsize(path) != _HEADER_SIZE + count * dtype.itemsize:
+        os.truncate(path, _HEADER_SIZE + count * dtype.itemsize)
+    return count
+
+def _open_records(path:str, dtype:np.dtype, count:int, mode:str) -> np.ndarray:
+    if count == 0:
+        # numpy can't memory-map an empty region
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=_HEADER_SIZE, shape=(count,))
@@ -1,8 +1,10 @@
 """Module with all game-related objects."""
 from .player import player
 from .ship import ship
+from .projectile import projectile
 
 __all__ = [
     "player",
-    "ship"
+    "ship",
+    "projectile",
 ]
@@ -1,18 +1,37 @@
 """A player in the game, most likely a computer playing"""
 from game.game_objects.ship import ship
-class player: # pylint: disable=too-few-public-methods
+class player:
     """A player in the game, most likely a computer playing"""
     def __init__(self, player_id:int, budget:int):
         self.id = player_id
         self.budget:float = budget
         self.ships:list[ship] = []
 
-    def add_ship(self, ship_to_add:ship):
+    def add_ship(self, ship_to_add:ship, charge_budget:bool = True):
         """adds a ship to the player's fleet,
         also subtracts the cost of the ship from the player's budget
 
         Args:
             ship_to_add (ship): ship to add
+            charge_budget (bool, optional): whether to subtract the ship's cost. Defaults to True.
         """
+        ship_to_add.fleet_index = len(self.ships)
         self.ships.append(ship_to_add)
-        self.budget -= ship_to_add.config.get_ship_cost()
+        if charge_budget:
+            self.budget -= ship_to_add.config.get_ship_cost()
+
+    def remove_ship(self, ship_to_remove:ship):
+        """removes a ship from the player's fleet in O(1),
+        the last ship in the fleet takes its place in `ships`
+
+        Args:
+            ship_to_remove (ship): ship to remove, must be in this player's fleet
+        """
+        index = ship_to_remove.fleet_index
+        if index < 0 or index >= len(self.ships) or self.ships[index] is not ship_to_remove:
+            raise ValueError(f"ship is not in player {self.id}'s fleet")
+        last_ship = self.ships.pop()
+        if last_ship is not ship_to_remove:
+            self.ships[index] = last_ship
+            last_ship.fleet_index = index
+        ship_to_remove.fleet_index = -1
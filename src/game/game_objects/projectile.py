@@ -0,0 +1,32 @@
+"""A projectile fired by a ship"""
+from math_lib.vector2 import vector2
+from physics.physics_object import physics_object, collider
+class projectile(physics_object): # pylint: disable=too-few-public-methods
+    """A projectile fired by a ship"""
+    def __init__(self, # pylint: disable=too-many-arguments
+                 initial_position:vector2,
+                 initial_velocity:vector2,
+                 owned_by:int,
+                 *,
+                 radius:float = 0.5,
+                 mass:float = 1.0,
+                 damage:float = 1.0,
+                 ):
+        """Projectile class
+
+        Args:
+            initial_position (vector2): initial position
+            initial_velocity (vector2): initial velocity
+            owned_by (int): player ID of who fired this projectile
+            radius (float, optional): radius in meters. Defaults to 0.5.
+            mass (float, optional): mass in kg. Defaults to 1.0.
+            damage (float, optional): damage dealt on impact, in health units. Defaults to 1.0.
+        """
+        super().__init__(
+            position=initial_position,
+            velocity=initial_velocity,
+            mass=mass,
+            phys_collider=collider(radius=radius)
+        )
+        self.owned_by = owned_by
+        self.damage = damage
@@ -31,3 +31,5 @@ class ship(physics_object):
         self.position = initial_position
         self.velocity = initial_velocity
         self.owned_by = owned_by
+        self.fleet_index = -1
+        '''index in the owning player's `ships` list, managed by the player'''
@@ -1,33 +1,91 @@
 """The game world holds all the physics objects and simulates them"""
 import math
 import random
+from typing import Callable
+import numpy as np
 from physics.physics_object import physics_object, collider
+from physics.orbits import GRAVITATIONAL_CONSTANT
+from physics.contact_solver import contact_solver, CONTACT_DTYPE
 from math_lib.vector2 import vector2
+from .object_pool import object_pool, object_handle
+from .object_registry import object_registry, object_tags, OBJECT_KINDS, SHIP
+from .world_snapshot import world_snapshot, frozen_copy
+from .component_table import component_table
+from .body_state import body_state
+from .region_sharding import region_sharding
 
-class game_world: # pylint: disable=too-few-public-methods
+class game_world: # pylint: disable=too-many-instance-attributes
     """Holds the game world and any physics objects to simulate
     """
-    def __init__(self,
+    def __init__(self, # pylint: disable=too-many-arguments
                  world_size: float,
                  asteroid_amount: int,
                  asteroid_size_mean: float,
                  asteroid_size_stddev: float,
+                 *,
+                 planet_mass: float = 0.0,
+                 planet_radius: float = 0.0,
+                 dtype: np.dtype | type = np.float64,
+                 rebase_interval: int = 0,
+                 solver: contact_solver | None = None,
+                 sharding: region_sharding | None = None,
                  ):
-        self.physics_objects: list[physics_object] = []
+        self._pool = object_pool()
+        self.physics_objects: list[physics_object] = self._pool.objects
+        # ^ dense, objects are only ever added/removed through spawn/despawn
+        self.registry = object_registry()
+        '''indexes of the objects by kind and owner, use these instead of scanning `physics_objects`'''
+        self.components: list[component_table] = []
+        '''numpy-backed state tables, kept row-aligned with `physics_objects`'''
+        self._pending_despawns: list[object_handle] = []
+        self.spawn_callbacks: list[Callable[[physics_object], None]] = []
+        '''called with every object right after it is spawned'''
+        self.despawn_callbacks: list[Callable[[physics_object], None]] = []
+        '''called with every object right after it has been removed from the world'''
+        self.contact_solver = solver
+        '''bounces colliding objects off each other every update, None to let everything pass through everything'''
+        self.contacts = np.empty(0, dtype=CONTACT_DTYPE)
+        '''contacts resolved during the last update, rows are only valid until its despawns were flushed'''
+        self.contact_callbacks: list[Callable[[np.ndarray], None]] = []
+        '''called with the CONTACT_DTYPE contacts of every update, before any despawns are flushed'''
+        self.sharding = sharding
+        '''spreads integration and collisions over worker processes by region, None to step everything here'''
+        self.body_state = body_state(GRAVITATIONAL_CONSTANT * planet_mass, dtype=dtype,
+                                     allocator=sharding.allocator if sharding is not None else None)
+        '''position, velocity etc. of every object, integrated in bulk'''
+        self.add_component(self.body_state)
+        self.tags = object_tags()
+        '''kind and owner of every object, as columns'''
+        self.add_component(self.tags)
         self.world_size = world_size
+        self.planet_radius = planet_radius
         self.asteroid_amount = asteroid_amount
+        self.rebase_interval = rebase_interval
+        '''updates between moving the floating origin to the ships, 0 to never move it, see `rebase_origin`'''
+        self._updates_since_rebase = 0
         for _ in range(asteroid_amount):
+            position = vector2(
+                random.uniform(-world_size, world_size),
+                random.uniform(-world_size, world_size)
+            )
+            velocity = vector2(0,0)
+            # velocity=vector2(
+            #     random.uniform(-1, 1),
+            #     random.uniform(-1, 1)
+            # )
+            if self.body_state.orbit_mode:
+                while position.length <= planet_radius:
+                    position = vector2(
+                        random.uniform(-world_size, world_size),
+                        random.uniform(-world_size, world_size)
+                    )
+                # start on a circular, counter-clockwise orbit
+                velocity = vector2(-position.y, position.x) \
+                    * (math.sqrt(self.body_state.gravitational_parameter / position.length) / position.length)
             self._add_asteroid(
                 size=abs(random.gauss(asteroid_size_mean, asteroid_size_stddev)),
-                position=vector2(
-                    random.uniform(-world_size, world_size),
-                    random.uniform(-world_size, world_size)
-                ),
-                # velocity=vector2(
-                #     random.uniform(-1, 1),
-                #     random.uniform(-1, 1)
-                # )
-                velocity=vector2(0,0)
+                position=position,
+                velocity=velocity
             )
 
     def _add_asteroid(self, size:float, position:vector2, velocity:vector2):
@@ -38,7 +96,7 @@ class game_world: # pylint: disable=too-few-public-methods
             position (vector2): position of the asteroid in the game world
             velocity (vector2): velocity of the asteroid in the game world
         """
-        self.physics_objects.append(
+        self.spawn(
             physics_object(
                 position=position,
                 velocity=velocity,
@@ -48,11 +106,190 @@ class game_world: # pylint: disable=too-few-public-methods
                 )
             )
         )
+
+    def spawn(self, obj:physics_object) -> object_handle:
+        """add an object to the game world, it is simulated from the next update onwards
+
+        Args:
+            obj (physics_object): object to add, must not already be in a game world
+
+        Returns:
+            object_handle: handle to the object, also stored in `obj.handle`
+        """
+        if obj.handle is not None:
+            raise ValueError(f"{obj} is already spawned")
+        obj.handle = self._pool.add(obj)
+        self.registry.add(obj)
+        row = len(self.physics_objects) - 1
+        for component in self.components:
+            component.on_spawn(obj, row)
+        if self.sharding is not None:
+            self.sharding.rows_changed()
+        for callback in self.spawn_callbacks:
+            callback(obj)
+        return obj.handle
+
+    def despawn(self, handle:object_handle):
+        """queue an object for removal, it is removed at the end of the current (or next) update,
+        so systems iterating over the world never see it disappear mid-tick
+
+        Args:
+            handle (object_handle): handle of the object to remove, stale handles are ignored
+        """
+        self._pending_despawns.append(handle)
+
+    def flush_despawns(self):
+        """remove every object queued by `despawn` right away"""
+        for handle in self._pending_despawns:
+            row = self._pool.row_of(handle)
+            if row < 0:
+                continue # despawned twice, or already gone
+            last_row = len(self.physics_objects) - 1
+            for component in self.components:
+                component.on_despawn(self.physics_objects[row], row, last_row)
+            obj = self._pool.remove(handle)
+            self.registry.remove(obj, handle.slot)
+            obj.handle = None
+            for callback in self.despawn_callbacks:
+                callback(obj)
+            if self.contact_solver is not None:
+                self.contact_solver.reset() # rows moved, last tick's contacts no longer line up
+            if self.sharding is not None:
+                self.sharding.rows_changed()
+        self._pending_despawns.clear()
+
+    def add_component(self, component:component_table):
+        """start keeping a component table row-aligned with the world's objects,
+        rows are filled in for every object that is already spawned
+
+        Args:
+            component (component_table): the table to add
+        """
+        for row, obj in enumerate(self.physics_objects):
+            component.on_spawn(obj, row)
+        self.components.append(component)
+
+    def row_of(self, handle:object_handle) -> int:
+        """row of an object in `physics_objects` and every component table, only valid until the next despawn
+
+        Args:
+            handle (object_handle): handle returned by `spawn`
+
+        Returns:
+            int: the row, or -1 if the object has been despawned
+        """
+        return self._pool.row_of(handle)
+
+    def get(self, handle:object_handle) -> physics_object | None:
+        """resolve a handle to its object
+
+        Args:
+            handle (object_handle): handle returned by `spawn`
+
+        Returns:
+            physics_object | None: the object, or None if it has been despawned
+        """
+        return self._pool.get(handle)
+
     def update(self, time_delta:float):
-        """Update the game world and all physics objects in it
+        """Update the game world and all physics objects in it,
+        the same as `integrate`, `resolve_contacts` and `end_update` in a row
+
+        Args:
+            time_delta (float): time since last update in seconds
+        """
+        self.integrate(time_delta)
+        self.resolve_contacts()
+        self.end_update()
+
+    def integrate(self, time_delta:float):
+        """move every body by one tick, applying (then clearing) the forces accumulated this tick
 
         Args:
             time_delta (float): time since last update in seconds
         """
-        for phys_obj in self.physics_objects:
-            phys_obj.update(time_delta)
+        if self.sharding is not None:
+            self.sharding.integrate(self.body_state, time_delta)
+        else:
+            self.body_state.integrate(time_delta)
+
+    def resolve_contacts(self):
+        """bounce colliding bodies off each other, then hand the contacts to `contact_callbacks`"""
+        if self.contact_solver is None:
+            return
+        bodies = self.body_state
+        if self.sharding is not None:
+            self.contacts = self.sharding.resolve_contacts(bodies, self.contact_solver)
+        else:
+            self.contacts = self.contact_solver.solve(
+                bodies.column("position"),
+                bodies.column("velocity"),
+                masses=bodies.column("mass"),
+                rotation=bodies.column("rotation"),
+                radius=bodies.column("radius"),
+                extent=bodies.column("extent"),
+            )
+        for callback in self.contact_callbacks:
+            callback(self.contacts)
+
+    def end_update(self):
+        """finish an update: flush queued despawns and move the floating origin when it is due"""
+        self.registry.positions_changed()
+        self.flush_despawns()
+        if self.rebase_interval > 0:
+            self._updates_since_rebase += 1
+            if self._updates_since_rebase >= self.rebase_interval:
+                self.rebase_origin()
+
+    def rebase_origin(self):
+        """move the floating origin of `body_state` to the centroid of the ships (of everything if there are no ships),
+        so the stored positions stay small, and precise, around wherever the action is
+        """
+        self._updates_since_rebase = 0
+        positions = self.body_state.column("position")
+        ships = self.tags.column("kind") == OBJECT_KINDS.index(SHIP)
+        if np.any(ships):
+            positions = positions[ships]
+        if len(positions) == 0:
+            return
+        self.body_state.rebase(positions.mean(axis=0, dtype=np.float64) + self.body_state.origin)
+
+    def close(self):
+        """stop the sharding's worker processes, if any, the world can't be updated afterwards"""
+        if self.sharding is not None:
+            self.sharding.close()
+
+    def propagate(self, duration:float):
+        """jump the whole world ahead in time in one step, ignoring any forces,
+        exact in orbit mode no matter how long `duration` is
+
+        Args:
+            duration (float): how far ahead to jump, in seconds
+        """
+        self.body_state.propagate(duration)
+        self.registry.positions_changed()
+        self.flush_despawns()
+
+    def snapshot(self, tick:int = 0, num_players:int = 0) -> world_snapshot:
+        """copy the drawable state of the world into an immutable snapshot
+
+        Args:
+            tick (int, optional): tick number to stamp the snapshot with. Defaults to 0.
+            num_players (int, optional): number of players in the game. Defaults to 0.
+
+        Returns:
+            world_snapshot: the snapshot, shares no memory with the world
+        """
+        return world_snapshot(
+            tick=tick,
+            num_players=num_players,
+            world_size=self.world_size,
+            planet_radius=self.planet_radius,
+            position=frozen_copy(self.body_state.column("position")),
+            rotation=frozen_copy(self.body_state.column("rotation")),
+            radius=frozen_copy(self.body_state.column("radius")),
+            extent=frozen_copy(self.body_state.column("extent")),
+            kind=frozen_copy(self.tags.column("kind")),
+            owner=frozen_copy(self.tags.column("owner")),
+            origin=tuple(self.body_state.origin.tolist()),
+        )
@@ -1,22 +1,46 @@
 """`game` object actually handles running the game loop and holds the game state."""
+from __future__ import annotations
 import random
 import math
+import numpy as np
 from math_lib.vector2 import vector2
+from physics.physics_object import physics_object
+from physics.contact_solver import contact_solver
 from .config_classes.game_configuration import game_config
 from .game_world import game_world
+from .object_pool import object_handle
+from .world_snapshot import world_snapshot
+from .ship_status import ship_status, DESTRUCTION_EVENT_DTYPE
+from .system_scheduler import system_scheduler
+from .region_sharding import region_sharding
 from . import game_objects
 
-class game: # pylint: disable=too-few-public-methods
+class game:
     """A class to hold the game state and process the game loop
     """
     def __init__(self, game_configuration: game_config):
         self.game_config = game_configuration
+        self.tick = 0
+        '''number of updates run so far'''
         # setup the game world
         self.game_world = game_world(
             world_size=game_configuration.world_radius,
             asteroid_amount=game_configuration.asteroid_amount,
             asteroid_size_mean=game_configuration.asteroid_size_mean,
             asteroid_size_stddev=game_configuration.asteroid_size_stddev,
+            planet_mass=game_configuration.planet_mass,
+            planet_radius=game_configuration.planet_radius,
+            dtype=np.float32 if game_configuration.float32_state else np.float64,
+            rebase_interval=game_configuration.rebase_interval if game_configuration.float32_state else 0,
+            solver=contact_solver(
+                game_configuration.solver_iterations,
+                restitution=game_configuration.restitution,
+                friction=game_configuration.friction,
+            ) if game_configuration.solver_iterations > 0 else None,
+            sharding=region_sharding(
+                game_configuration.shard_workers,
+                game_configuration.shard_tile_size,
+            ) if game_configuration.shard_workers > 0 else None,
         )
         # setup the players
         assert len(game_configuration.player_configs) == game_configuration.num_players
@@ -50,13 +74,43 @@ class game: # pylint: disable=too-few-public-methods
                         owned_by=newplayer.id
                 )
                 new_ship.rotation = player_config.initial_direction + (math.pi / 2)
-                newplayer.ships.append(new_ship)
+                newplayer.add_ship(new_ship, charge_budget=False)
             self.players.append(newplayer)
 
         # add the players to the game world
+        self.ship_status = ship_status()
+        '''health, heat and throttle of every ship, see `ship_status`'''
+        self.destruction_events = np.empty(0, dtype=DESTRUCTION_EVENT_DTYPE)
+        '''ships destroyed during the last update'''
+        self.game_world.add_component(self.ship_status)
+        self.game_world.despawn_callbacks.append(self._on_despawn)
+        self.game_world.contact_callbacks.append(self._on_contacts)
         for player in self.players:
             for ship in player.ships:
-                self.game_world.physics_objects.append(ship)
+                self.game_world.spawn(ship)
+
+        self.scheduler = system_scheduler(max_workers=game_configuration.system_threads)
+        '''the systems run by `update`, add more with `scheduler.add_system`'''
+        self.scheduler.add_system(
+            "ship_status", self.update_ship_status,
+            reads=("ship_status",),
+            writes=("ship_status.heat", "ship_status.health", "ship_status.destroyed", "despawns"),
+        )
+        self.scheduler.add_system(
+            "thrust", self.apply_thrust,
+            reads=("ship_status.throttle", "ship_status.thrust", "ship_status.destroyed", "body_state.rotation"),
+            writes=("body_state.force",),
+        )
+        self.scheduler.add_system(
+            "integrate", self.game_world.integrate,
+            reads=("body_state.mass",),
+            writes=("body_state.position", "body_state.velocity", "body_state.force"),
+        )
+        self.scheduler.add_system(
+            "contacts", lambda _: self.game_world.resolve_contacts(),
+            reads=("body_state.mass", "body_state.rotation", "body_state.radius", "body_state.extent"),
+            writes=("body_state.position", "body_state.velocity", "contacts", "ship_status.health"), # health through `_on_contacts`
+        )
 
     def update(self, time_delta:float):
         """Update the game state
@@ -64,4 +118,76 @@ class game: # pylint: disable=too-few-public-methods
         Args:
             time_delta (float): time since last update
         """
-        self.game_world.update(time_delta)
+        self.scheduler.run(time_delta)
+        self.game_world.end_update() # despawns are only flushed once every system is done with the rows
+        self.tick += 1
+
+    def close(self):
+        """stop any worker threads and processes, the game can't be updated afterwards"""
+        self.scheduler.close()
+        self.game_world.close()
+
+    def __enter__(self) -> game:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def snapshot(self) -> world_snapshot:
+        """immutable copy of the current state, for rendering somewhere else
+
+        Returns:
+            world_snapshot: snapshot of the game world
+        """
+        return self.game_world.snapshot(tick=self.tick, num_players=len(self.players))
+
+    def coast(self, duration:float):
+        """jump the game ahead in one step, only possible while no ship is thrusting,
+        in orbit mode this is exact no matter how long `duration` is
+
+        Args:
+            duration (float): how far ahead to jump, in seconds
+        """
+        if np.any(self.ship_status.column("throttle")):
+            raise ValueError("can't coast while ships are thrusting, step with update() instead")
+        self.update_ship_status(duration)
+        self.game_world.propagate(duration)
+
+    def apply_thrust(self, time_delta:float): # pylint: disable=unused-argument
+        """add every ship's thrust to the forces acting on it this tick
+
+        Args:
+            time_delta (float): time since last update, unused, the force is integrated by the game world
+        """
+        bodies = self.game_world.body_state
+        bodies.column("force")[:] += self.ship_status.thrust_forces(bodies.column("rotation"))
+
+    def update_ship_status(self, time_delta:float):
+        """update ship heat and health, and despawn any ships that got destroyed
+
+        Args:
+            time_delta (float): time since last update
+        """
+        self.destruction_events = self.ship_status.update(time_delta)
+        for slot, generation in zip(self.destruction_events["slot"].tolist(),
+                                    self.destruction_events["generation"].tolist()):
+            self.game_world.despawn(object_handle(slot, generation))
+
+    def _on_despawn(self, obj:physics_object):
+        """keep the players' fleets in sync with ships leaving the game world"""
+        if isinstance(obj, game_objects.ship):
+            self.players[obj.owned_by].remove_ship(obj)
+
+    def _on_contacts(self, contacts:np.ndarray):
+        """collision damage, both ships in an impact take damage from the impulse it takes to stop them approaching,
+        contacts closing slower than `impact_speed_threshold` (resting, pushing) deal none,
+        ships destroyed this way are reported and despawned by the next update"""
+        if len(contacts) == 0 or self.game_config.impact_damage == 0:
+            return
+        # not the solver's impulse, that also holds up resting contacts every tick (and bounces)
+        mass = self.game_world.body_state.column("mass")
+        inverse_mass = np.where(mass > 0, 1 / np.where(mass > 0, mass, 1), 0)
+        stopping_impulse = contacts["closing_speed"] / (inverse_mass[contacts["a"]] + inverse_mass[contacts["b"]])
+        damage = np.where(contacts["closing_speed"] > self.game_config.impact_speed_threshold,
+                          stopping_impulse * self.game_config.impact_damage, 0)
+        self.ship_status.apply_damage(np.concatenate((contacts["a"], contacts["b"])), np.concatenate((damage, damage)))
@@ -0,0 +1,114 @@
+"""Runs matches without any rendering, for tournaments and GA evaluation"""
+import dataclasses
+import random
+from dataclasses import dataclass
+from typing import Callable
+from .config_classes.game_configuration import game_config
+from .gamerunner import game
+from .match_cache import match_cache, match_key
+from .world_snapshot import world_snapshot
+
+@dataclass
+class match_result:
+    """Outcome of a finished match"""
+    seed: int
+    ticks: int
+    simulated_time: float # seconds
+    ships_remaining: list[int] # one entry per player
+
+
+def run_match(config:game_config, # pylint: disable=too-many-arguments
+              seed:int,
+              ticks:int,
+              time_delta:float = 0.001,
+              *,
+              frame_sink:Callable[[world_snapshot], None] | None = None,
+              frame_interval:int = 16) -> match_result:
+    """simulate a single match from start to finish
+
+    Args:
+        config (game_config): config of the match
+        seed (int): random seed, the same config and seed always produce the same match
+        ticks (int): how many updates to simulate
+        time_delta (float, optional): seconds per update. Defaults to 0.001.
+        frame_sink (Callable[[world_snapshot], None] | None, optional): gets a snapshot every `frame_interval` ticks,
+            e.g. `render_pipeline.publish` to record the match. Defaults to None.
+        frame_interval (int, optional): ticks between snapshots sent to `frame_sink`. Defaults to 16.
+
+    Returns:
+        match_result: the outcome of the match
+    """
+    # the game draws from the global random module, seed it for the duration of the match only
+    outer_state = random.getstate()
+    random.seed(seed)
+    try:
+        game_instance = game(config)
+        try:
+            for tick in range(ticks):
+                game_instance.update(time_delta)
+                if frame_sink is not None and tick % frame_interval == 0:
+                    frame_sink(game_instance.snapshot())
+        finally:
+            game_instance.close() # worker threads/processes and shared memory, if the config asked for any
+    finally:
+        random.setstate(outer_state)
+    return match_result(
+        seed=seed,
+        ticks=ticks,
+        simulated_time=ticks * time_delta,
+        ships_remaining=[len(player.ships) for player in game_instance.players],
+    )
+
+
+class headless_runner:
+    """Runs matches back to back, skipping any that have already been played
+    """
+    def __init__(self,
+                 ticks:int,
+                 time_delta:float = 0.001,
+                 agent_version:str = "0",
+                 cache:match_cache | None = None):
+        """Headless match runner
+
+        Args:
+            ticks (int): how many updates to simulate per match
+            time_delta (float, optional): seconds per update. Defaults to 0.001.
+            agent_version (str, optional): version of the agents, part of the cache key. Defaults to "0".
+            cache (match_cache | None, optional): cache of finished matches, None to always simulate. Defaults to None.
+        """
+        self.ticks = ticks
+        self.time_delta = time_delta
+        self.agent_version = agent_version
+        self.cache = cache
+
+    def run(self, config:game_config, seed:int) -> match_result:
+        """get the result of a match, from the cache if it has been played before
+
+        Args:
+            config (game_config): config of the match
+            seed (int): random seed of the match
+
+        Returns:
+            match_result: the outcome of the match
+        """
+        if self.cache is None:
+            return run_match(config, seed, self.ticks, self.time_delta)
+        # tick count and timestep change the outcome just as much as the config does
+        key = match_key(config, seed, f"{self.agent_version}/{self.ticks}/{self.time_delta!r}")
+        cached = self.cache.get(key)
+        if cached is not None:
+            return match_result(**cached)
+        result = run_match(config, seed, self.ticks, self.time_delta)
+        self.cache.put(key, dataclasses.asdict(result))
+        return result
+
+    def run_many(self, matchups:list[tuple[game_config, int]]) -> list[match_result]:
+        """run a list of (config, seed) matchups, e.g. one GA generation against its opponents
+
+        Args:
+            matchups (list[tuple[game_config, int]]): configs and seeds to run
+
+        Returns:
+            list[match_result]: results, in the same order as `matchups`
+        """
+        return [self.run(config, seed) for config, seed in matchups]
@@ -0,0 +1,151 @@
+"""Content-addressed on-disk cache of finished match results"""
+import dataclasses
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any
+from .config_classes.game_configuration import game_config
+
+MATCH_KEY_VERSION = 2 # 2: orbit mode, body_state integration, contact solver
+'''bump this whenever the simulation changes in a way that changes match results,
+so stale results stop matching instead of being served from the cache'''
+
+
+def match_key(config:game_config, seed:int, agent_version:str) -> str:
+    """stable hash of everything that decides the outcome of a match
+
+    The config is serialised as sorted JSON, floats use their shortest round-trip repr,
+    so the key is the same across processes, machines and python versions.
+
+    Args:
+        config (game_config): the full game config, including player configs and fleets
+        seed (int): random seed the match is run with
+        agent_version (str): version of the agents controlling the players
+
+    Returns:
+        str: hex digest identifying the match
+    """
+    payload = json.dumps(
+        {
+            "key_version": MATCH_KEY_VERSION,
+            "config": dataclasses.asdict(config),
+            "seed": seed,
+            "agent_version": agent_version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        allow_nan=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class match_cache:
+    """Size-bounded LRU cache of match results, one small JSON file per result.
+
+    Recency is kept in the files' modification times, so it survives restarts
+    and can be shared (loosely) between processes using the same directory.
+    """
+    def __init__(self, directory:str, max_bytes:int = 256 * 1024 * 1024):
+        """Open (or create) a match cache
+
+        Args:
+            directory (str): directory to keep the cache in
+            max_bytes (int, optional): total size the cache is allowed to grow to. Defaults to 256MiB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        # key -> size in bytes, least recently used first
+        self._entries:OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        existing = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                existing.append((stat.st_mtime_ns, entry.name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key:str) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        """total size of all cached results on disk"""
+        return self._total_bytes
+
+    def get(self, key:str) -> dict[str, Any] | None:
+        """look up a cached result, marking it as recently used
+
+        Args:
+            key (str): key from `match_key`
+
+        Returns:
+            dict[str, Any] | None: the stored result, or None on a miss
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                result = json.load(file)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # evicted by another process, or a torn write, treat it as a miss
+            self._forget(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key:str, result:dict[str, Any]):
+        """store a result, evicting the least recently used results if the cache is over size
+
+        Args:
+            key (str): key from `match_key`
+            result (dict[str, Any]): JSON-serialisable result
+        """
+        data = json.dumps(result, sort_keys=True).encode("utf-8")
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path) # atomic, readers never see half a result
+        self._forget(key)
+        self._entries[key] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def clear(self):
+        """remove every cached result"""
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _path(self, key:str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _forget(self, key:str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _remove(self, key:str):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
@@ -0,0 +1,113 @@
+"""Dense storage for game objects, with stable handles that survive other objects being removed"""
+from typing import NamedTuple
+from physics.physics_object import physics_object
+
+class object_handle(NamedTuple):
+    """Stable reference to a pooled object.
+
+    The generation is bumped every time a slot is reused,
+    so a handle to a removed object can never resolve to whatever took its slot.
+    """
+    slot: int
+    generation: int
+
+
+class object_pool:
+    """Holds objects in a dense list (no holes, cheap to iterate),
+    while handing out slot handles that stay valid as other objects are removed.
+
+    Removal swaps the last object into the hole, so adding and removing are both O(1)
+    and iteration order is not preserved across removals.
+    """
+    def __init__(self):
+        self.objects:list[physics_object] = []
+        '''every live object, densely packed'''
+        self._row_slots:list[int] = [] # row in `objects` -> slot
+        self._slot_rows:list[int] = [] # slot -> row in `objects`, -1 if the slot is free
+        self._slot_generations:list[int] = []
+        self._free_slots:list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def add(self, obj:physics_object) -> object_handle:
+        """add an object to the end of the dense list
+
+        Args:
+            obj (physics_object): object to add
+
+        Returns:
+            object_handle: handle to the object
+        """
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slot_rows)
+            self._slot_rows.append(-1)
+            self._slot_generations.append(0)
+        self._slot_rows[slot] = len(self.objects)
+        self._row_slots.append(slot)
+        self.objects.append(obj)
+        return object_handle(slot, self._slot_generations[slot])
+
+    def remove(self, handle:object_handle) -> physics_object:
+        """remove an object right away, the last object is moved into its row
+
+        Args:
+            handle (object_handle): handle of the object to remove
+
+        Returns:
+            physics_object: the removed object
+        """
+        row = self.row_of(handle)
+        if row < 0:
+            raise KeyError(f"{handle} does not refer to a live object")
+        removed = self.objects[row]
+        last_row = len(self.objects) - 1
+        if row != last_row:
+            moved_slot = self._row_slots[last_row]
+            self.objects[row] = self.objects[last_row]
+            self._row_slots[row] = moved_slot
+            self._slot_rows[moved_slot] = row
+        self.objects.pop()
+        self._row_slots.pop()
+        self._slot_rows[handle.slot] = -1
+        self._slot_generations[handle.slot] += 1
+        self._free_slots.append(handle.slot)
+        return removed
+
+    def row_of(self, handle:object_handle) -> int:
+        """find where an object currently sits in the dense list
+
+        Args:
+            handle (object_handle): handle of the object
+
+        Returns:
+            int: row in `objects`, or -1 if the handle is stale
+        """
+        if handle.slot >= len(self._slot_rows) or self._slot_generations[handle.slot] != handle.generation:
+            return -1
+        return self._slot_rows[handle.slot]
+
+    def get(self, handle:object_handle) -> physics_object | None:
+        """resolve a handle
+
+        Args:
+            handle (object_handle): handle of the object
+
+        Returns:
+            physics_object | None: the object, or None if it has been removed
+        """
+        row = self.row_of(handle)
+        return self.objects[row] if row >= 0 else None
+
+    def is_alive(self, handle:object_handle) -> bool:
+        """check whether a handle still refers to a live object
+
+        Args:
+            handle (object_handle): handle to check
+
+        Returns:
+            bool: True if the object has not been removed
+        """
+        return self.row_of(handle) >= 0
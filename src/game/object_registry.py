@@ -0,0 +1,218 @@
+"""Indexes of the game world's objects by kind and owner, so nothing has to rescan the whole world"""
+from __future__ import annotations
+from collections.abc import Hashable
+import numpy as np
+from physics.physics_object import physics_object
+from .component_table import component_table
+from .game_objects.ship import ship
+from .game_objects.projectile import projectile
+
+ASTEROID = "asteroid"
+SHIP = "ship"
+PROJECTILE = "projectile"
+OBJECT_KINDS = (ASTEROID, SHIP, PROJECTILE)
+
+def kind_of(obj:physics_object) -> str:
+    """classify an object, only done once when it is spawned
+
+    Args:
+        obj (physics_object): object to classify
+
+    Returns:
+        str: one of OBJECT_KINDS
+    """
+    if isinstance(obj, ship):
+        return SHIP
+    if isinstance(obj, projectile):
+        return PROJECTILE
+    return ASTEROID # anything else is just a rock floating around
+
+
+class object_tags(component_table):
+    """Kind and owner of every object as numpy columns, for systems that work on whole columns at once
+    """
+    def __init__(self):
+        super().__init__({
+            "kind": (np.uint8, ()), # index into OBJECT_KINDS
+            "owner": (np.int32, ()), # player ID, -1 if nobody owns the object
+        })
+
+    def init_row(self, obj:physics_object, row:int):
+        """tag a freshly spawned object
+
+        Args:
+            obj (physics_object): the new object
+            row (int): its row
+        """
+        self._columns["kind"][row] = OBJECT_KINDS.index(kind_of(obj))
+        owner = getattr(obj, "owned_by", None)
+        self._columns["owner"][row] = -1 if owner is None else owner
+
+
+class object_group:
+    """A dense set of objects with O(1) add/remove, plus aggregates over them
+    """
+    def __init__(self):
+        self.objects:list[physics_object] = []
+        self._rows:dict[int, int] = {} # handle slot -> index in `objects`
+        self._bounding_box:tuple[float,float,float,float] | None = None
+        self._bounding_box_valid = True
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def add(self, obj:physics_object):
+        """add a spawned object, grows the cached bounding box instead of invalidating it
+
+        Args:
+            obj (physics_object): object to add, must have a handle
+        """
+        self._rows[obj.handle[0]] = len(self.objects)
+        self.objects.append(obj)
+        if self._bounding_box_valid:
+            x, y = obj.position.to_tuple()
+            if self._bounding_box is None:
+                self._bounding_box = (x, x, y, y)
+            else:
+                minx, maxx, miny, maxy = self._bounding_box
+                self._bounding_box = (min(minx, x), max(maxx, x), min(miny, y), max(maxy, y))
+
+    def remove(self, obj:physics_object, slot:int):
+        """remove an object, the last object takes its place
+
+        Args:
+            obj (physics_object): object to remove
+            slot (int): handle slot the object was spawned with
+        """
+        index = self._rows.pop(slot)
+        last = self.objects.pop()
+        if last is not obj:
+            self.objects[index] = last
+            self._rows[last.handle[0]] = index
+        self._bounding_box_valid = False
+
+    def invalidate(self):
+        """forget any aggregates that depend on positions, call after objects have moved"""
+        self._bounding_box_valid = False
+
+    def bounding_box(self) -> tuple[float,float,float,float] | None:
+        """bounding box of the positions of all objects in the group,
+        recomputed at most once per update, O(1) after that
+
+        Returns:
+            tuple[float,float,float,float] | None: (minx, maxx, miny, maxy), or None if the group is empty
+        """
+        if not self._bounding_box_valid:
+            if self.objects:
+                xs = [obj.position.x for obj in self.objects]
+                ys = [obj.position.y for obj in self.objects]
+                self._bounding_box = (min(xs), max(xs), min(ys), max(ys))
+            else:
+                self._bounding_box = None
+            self._bounding_box_valid = True
+        return self._bounding_box
+
+
+class object_registry:
+    """Keeps groups of objects by kind, by owner, and by (kind, owner), updated on spawn and despawn
+    """
+    def __init__(self):
+        self._groups:dict[Hashable, object_group] = {kind: object_group() for kind in OBJECT_KINDS}
+        self._kinds:dict[int, str] = {} # handle slot -> kind
+        self._empty = object_group()
+
+    def _keys(self, obj:physics_object, kind:str) -> list[Hashable]:
+        owner = getattr(obj, "owned_by", None)
+        if owner is None:
+            return [kind]
+        return [kind, ("owner", owner), (kind, owner)]
+
+    def add(self, obj:physics_object):
+        """index a freshly spawned object
+
+        Args:
+            obj (physics_object): object that was just spawned
+        """
+        kind = kind_of(obj)
+        self._kinds[obj.handle[0]] = kind
+        for key in self._keys(obj, kind):
+            if key not in self._groups:
+                self._groups[key] = object_group()
+            self._groups[key].add(obj)
+
+    def remove(self, obj:physics_object, slot:int):
+        """drop a despawned object from every index it is in
+
+        Args:
+            obj (physics_object): object that was despawned
+            slot (int): handle slot the object was spawned with
+        """
+        for key in self._keys(obj, self._kinds.pop(slot)):
+            self._groups[key].remove(obj, slot)
+
+    def positions_changed(self):
+        """invalidate positional aggregates, called once per world update"""
+        for group in self._groups.values():
+            group.invalidate()
+
+    def group(self, kind:str | None = None, owner:int | None = None) -> object_group:
+        """get the group of objects of a kind and/or owner
+
+        Args:
+            kind (str | None, optional): one of OBJECT_KINDS, None for any kind. Defaults to None.
+            owner (int | None, optional): player ID, None for any owner. Defaults to None.
+
+        Returns:
+            object_group: the (live, do not modify) group, empty if nothing matches
+        """
+        if owner is None:
+            if kind is None:
+                raise ValueError("need at least a kind or an owner")
+            key:Hashable = kind
+        else:
+            key = ("owner", owner) if kind is None else (kind, owner)
+        return self._groups.get(key, self._empty)
+
+    def by_kind(self, kind:str) -> list[physics_object]:
+        """every live object of a kind, O(1)
+
+        Args:
+            kind (str): one of OBJECT_KINDS
+
+        Returns:
+            list[physics_object]: live list, do not modify
+        """
+        return self.group(kind=kind).objects
+
+    def by_owner(self, owner:int, kind:str | None = None) -> list[physics_object]:
+        """every live object owned by a player, O(1)
+
+        Args:
+            owner (int): player ID
+            kind (str | None, optional): only objects of this kind. Defaults to any kind.
+
+        Returns:
+            list[physics_object]: live list, do not modify
+        """
+        return self.group(kind=kind, owner=owner).objects
+
+    def owners(self) -> list[int]:
+        """every player ID that currently owns at least one object
+
+        Returns:
+            list[int]: player IDs, ascending
+        """
+        return sorted(key[1] for key, group in self._groups.items()
+                      if isinstance(key, tuple) and key[0] == "owner" and len(group) > 0)
+
+    def bounding_box(self, kind:str | None = None, owner:int | None = None) -> tuple[float,float,float,float] | None:
+        """bounding box of a group's positions, see `object_group.bounding_box`
+
+        Args:
+            kind (str | None, optional): one of OBJECT_KINDS, None for any kind. Defaults to None.
+            owner (int | None, optional): player ID, None for any owner. Defaults to None.
+
+        Returns:
+            tuple[float,float,float,float] | None: (minx, maxx, miny, maxy), or None if the group is empty
+        """
+        return self.group(kind=kind, owner=owner).bounding_box()
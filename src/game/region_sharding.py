@@ -0,0 +1,418 @@
+"""Steps one very large game world on several processes at once, each working on its own tiles of space"""
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from physics.contact_solver import contact_solver, detect_contacts, find_pairs, CONTACT_DTYPE
+from .body_state import body_state, integrate_bodies
+
+_DETECTION_COLUMNS = ("position", "mass", "rotation", "radius", "extent")
+
+# name of the shared memory block, shape and dtype of an array, enough for another process to map it
+shared_array = tuple[str, tuple[int, ...], str]
+
+
+class shared_memory_allocator:
+    """`column_allocator` that gives every column its own shared memory block, so worker processes can map the columns
+    """
+    def __init__(self):
+        self._blocks:dict[int, SharedMemory] = {}
+        '''block behind every live array, by id of the array'''
+        self._released:list[SharedMemory] = []
+        # unlink the blocks even if the owner never calls `close`, otherwise they outlive the process
+        self._finalizer = weakref.finalize(self, _unlink_blocks, self._blocks, self._released)
+
+    def allocate(self, shape:tuple[int, ...], dtype:np.dtype | type) -> np.ndarray:
+        """a new zeroed array in a new shared memory block
+
+        Args:
+            shape (tuple[int, ...]): shape of the array
+            dtype (np.dtype | type): dtype of the array
+
+        Returns:
+            np.ndarray: the array
+        """
+        dtype = np.dtype(dtype)
+        block = SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[...] = 0
+        self._blocks[id(array)] = block
+        return array
+
+    def release(self, array:np.ndarray):
+        """free the block of an array from `allocate`, the memory stays mapped for any views still around
+
+        Args:
+            array (np.ndarray): the array
+        """
+        block = self._blocks.pop(id(array))
+        block.unlink()
+        self._released.append(block) # closing it now would invalidate those views
+
+    def describe(self, array:np.ndarray) -> shared_array:
+        """what another process needs to map an array from `allocate`, see `map_shared_arrays`
+
+        Args:
+            array (np.ndarray): the array
+
+        Returns:
+            shared_array: (block name, shape, dtype)
+        """
+        return self._blocks[id(array)].name, array.shape, array.dtype.str
+
+    def close(self):
+        """free every block, arrays from `allocate` must not be used afterwards,
+        also done when the allocator is garbage collected or the process exits"""
+        self._finalizer()
+
+
+def _unlink_blocks(blocks:dict[int, SharedMemory], released:list[SharedMemory]):
+    for block in blocks.values():
+        block.unlink()
+    released.extend(blocks.values()) # still mapped by the arrays, see `release`
+    blocks.clear()
+
+
+_mapped:dict[str, tuple[SharedMemory, np.ndarray]] = {}
+'''arrays a worker process has mapped so far, by block name'''
+
+def map_shared_arrays(arrays:dict[str, shared_array], count:int) -> dict[str, np.ndarray]:
+    """map arrays described by `shared_memory_allocator.describe` into this process,
+    mappings are kept around for the next call, blocks that are no longer asked for get unmapped
+
+    Args:
+        arrays (dict[str, shared_array]): descriptions of the arrays by column name
+        count (int): number of live rows
+
+    Returns:
+        dict[str, np.ndarray]: views of the first `count` rows of every array, by column name
+    """
+    wanted = {name for name, _, _ in arrays.values()}
+    for name in [name for name in _mapped if name not in wanted]:
+        block, array = _mapped.pop(name)
+        del array
+        block.close()
+    columns = {}
+    for column, (name, shape, dtype) in arrays.items():
+        if name not in _mapped:
+            block = SharedMemory(name=name)
+            _mapped[name] = block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        columns[column] = _mapped[name][1][:count]
+    return columns
+
+
+def tile_keys(position:np.ndarray, tile_size:float) -> np.ndarray:
+    """key of the tile every position is in, keys sort row by row (y first, then x),
+    so the tiles of any band of rows are one contiguous range of keys
+
+    Args:
+        position (np.ndarray): (n, 2) positions
+        tile_size (float): side length of the tiles
+
+    Returns:
+        np.ndarray: (n,) int64 keys, the tile's row is `key >> 32`
+    """
+    tile = np.clip(np.floor(position / np.float64(tile_size)), -2**31, 2**31 - 1).astype(np.int64)
+    return (tile[:, 1] << 32) + (tile[:, 0] + 2**31)
+
+
+class region_sharding: # pylint: disable=too-many-instance-attributes
+    """Splits the world into square tiles and spreads integration and collisions over a pool of worker processes.
+
+    The body_state columns live in shared memory (see `shared_memory_allocator`), so workers read and write them in place.
+    Rows are kept sorted by the tile they are in (`tile_keys`), also in shared memory,
+    and every worker gets a contiguous run of that order, whole tiles only, with about the same number of bodies:
+    - integration: a worker integrates its bodies, bodies are integrated on their own so this is exact,
+      and reports the bodies that crossed into another tile
+    - migration: those bodies (usually few) are moved to their new place in the order, nothing else is touched
+    - detection: a worker also sees the ghosts of its tiles, the bodies of the rows of tiles above and below close enough
+      to touch one of its bodies, and keeps the pairs whose lower row is one of its own bodies, so every pair is found once
+    - resolution: contacts are grouped into islands (contacts connected through movable bodies), which don't affect
+      each other, and whole islands are spread over the workers
+    Rows and the order of every sum stay the same as in `contact_solver.solve` and `body_state.integrate`,
+    so the results are bit-for-bit the same as stepping the world serially, just spread over `workers` cores.
+    All the per-body work happens in the workers, the calling process only moves the migrating bodies and the contacts around.
+
+    Workers are spawned processes, so scripts using this need the usual `if __name__ == "__main__":` guard.
+    The tile size should be a few times the biggest body, and the world should be many tiles tall:
+    every worker also looks at the ghost rows of tiles next to its own.
+    """
+    def __init__(self, workers:int, tile_size:float = 1000.0):
+        """Region sharding, pass it to a `game_world`
+
+        Args:
+            workers (int): worker processes, and the number of tasks every step is split into
+            tile_size (float, optional): side length of the tiles, meters. Defaults to 1000.0.
+        """
+        self.workers = workers
+        self.tile_size = tile_size
+        self.allocator = shared_memory_allocator()
+        '''allocator for the body_state columns, see `body_state.__init__`'''
+        self._executor:ProcessPoolExecutor | None = None
+        self._executor_finalizer:weakref.finalize | None = None
+        self._count = 0
+        self._order = self.allocator.allocate((0,), np.int64) # rows sorted by tile key
+        self._keys = self.allocator.allocate((0,), np.int64) # tile key of every entry of _order, sorted
+        self._max_radius = 0.0
+        self._stale = True
+
+    @property
+    def tile_count(self) -> int:
+        """number of tiles with at least one body in them"""
+        keys = self._keys[:self._count]
+        return int(np.count_nonzero(keys[1:] != keys[:-1])) + (self._count > 0)
+
+    def rows_changed(self):
+        """tell the sharding that bodies were spawned or despawned, the game world calls this"""
+        self._stale = True
+
+    def _submit(self, function, tasks:list[tuple]) -> list:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            self._executor_finalizer = weakref.finalize(self, self._executor.shutdown, wait=False)
+        futures = [self._executor.submit(function, *task) for task in tasks]
+        return [future.result() for future in futures] # re-raises anything a worker raised
+
+    def _shared(self, bodies:body_state) -> dict[str, shared_array]:
+        # always every array, so workers keep their mappings from one task to the next
+        shared = {name: self.allocator.describe(bodies.column_array(name)) for name in bodies.column_names}
+        shared["tile_order"] = self.allocator.describe(self._order)
+        shared["tile_key"] = self.allocator.describe(self._keys)
+        return shared
+
+    def _store(self, order:np.ndarray, keys:np.ndarray):
+        """write the tile order into shared memory, growing it if needed"""
+        if len(order) > len(self._order):
+            capacity = max(len(order), 2 * len(self._order))
+            for name in ("_order", "_keys"):
+                self.allocator.release(getattr(self, name))
+                setattr(self, name, self.allocator.allocate((capacity,), np.int64))
+        self._count = len(order)
+        self._order[:self._count] = order
+        self._keys[:self._count] = keys
+
+    def rebuild(self, bodies:body_state):
+        """sort every body into its tile from scratch, needed whenever rows changed
+
+        Args:
+            bodies (body_state): the bodies, stored with `allocator`
+        """
+        keys = tile_keys(bodies.column("position"), self.tile_size)
+        order = np.argsort(keys, kind="stable")
+        self._store(order, keys[order])
+        self._max_radius = float(bodies.column("radius").max()) if bodies.count > 0 else 0.0
+        self._stale = False
+
+    def _ranges(self) -> list[tuple[int, int]]:
+        """split the tile order into up to `workers` runs of about the same number of bodies, without splitting a tile"""
+        keys = self._keys[:self._count]
+        if self._count == 0:
+            return []
+        cuts = np.searchsorted(keys, keys[np.arange(1, self.workers) * self._count // self.workers], side="left")
+        bounds = np.unique(np.concatenate(([0], cuts, [self._count])))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def _migrate(self, places:np.ndarray, new_keys:np.ndarray): # pylint: disable=too-many-locals
+        """move the entries at `places` of the tile order to where their new keys belong, in place"""
+        if len(places) == 0:
+            return
+        order, keys = self._order[:self._count], self._keys[:self._count]
+        by_key = np.argsort(new_keys, kind="stable") # movers with the same insertion point have to be in key order
+        rows, new_keys = order[places][by_key], new_keys[by_key]
+        places = np.sort(places)
+        # slot among the entries that stay = entries with a smaller key, minus the movers among them (they come first, keys are sorted)
+        before = np.searchsorted(keys, new_keys)
+        slots = before - np.searchsorted(places, before) + np.arange(len(new_keys))
+        # an entry only shifts where a different number of movers left and arrived before it,
+        #   so just those stretches get rewritten, everything else stays where it is
+        events = np.concatenate([places, slots])
+        by_position = np.argsort(events, kind="stable")
+        events = events[by_position]
+        balance = np.cumsum(np.where(by_position < len(places), 1, -1))
+        ends = np.flatnonzero(balance == 0)
+        starts = np.concatenate([[0], ends[:-1] + 1])
+        first = events[starts]
+        first[1:] += first[1:] == events[ends[:-1]] # a stretch can start where the previous one ended
+        lengths = events[ends] - first + 1
+        dirty = np.repeat(first - np.cumsum(np.concatenate([[0], lengths[:-1]])), lengths) + np.arange(lengths.sum())
+        left, arrived = np.ones(len(dirty), dtype=bool), np.ones(len(dirty), dtype=bool)
+        left[np.searchsorted(dirty, places)] = False
+        arrived[np.searchsorted(dirty, slots)] = False
+        kept, freed = dirty[left], dirty[arrived]
+        order[freed], keys[freed] = order[kept], keys[kept]
+        order[slots], keys[slots] = rows, new_keys
+
+    def integrate(self, bodies:body_state, time_delta:float):
+        """`body_state.integrate` spread over the workers, bodies that cross a tile border migrate to their new tile
+
+        Args:
+            bodies (body_state): the bodies, stored with `allocator`
+            time_delta (float): time since last update in seconds
+        """
+        if self._stale:
+            self.rebuild(bodies)
+        shared = self._shared(bodies)
+        moved = self._submit(_integrate_task, [
+            (shared, bodies.count, first, last, time_delta,
+             bodies.gravitational_parameter, bodies.origin, self.tile_size)
+            for first, last in self._ranges()
+        ])
+        if moved:
+            self._migrate(np.concatenate([places for places, _ in moved]), np.concatenate([keys for _, keys in moved]))
+
+    def resolve_contacts(self, bodies:body_state, solver:contact_solver) -> np.ndarray: # pylint: disable=too-many-locals
+        """`contact_solver.solve` spread over the workers, including the warm starting,
+        call it right after `integrate`, that is what keeps the tile order up to date
+
+        Args:
+            bodies (body_state): the bodies, stored with `allocator`
+            solver (contact_solver): the solver to use the settings and warm start cache of
+
+        Returns:
+            np.ndarray: CONTACT_DTYPE array of the contacts, sorted by (a, b)
+        """
+        if self._stale:
+            self.rebuild(bodies)
+        shared = self._shared(bodies)
+        keys = self._keys[:self._count]
+        # two bodies can only touch if they are less than two of the biggest radius apart, so that plus some slack
+        # for rounding is how many rows of tiles above and below a run of tiles its ghosts can come from
+        band = int((2 * self._max_radius + 0.01 * self.tile_size) // self.tile_size) + 1
+        tasks = []
+        for first, last in self._ranges():
+            low = max(int(keys[first] >> 32) - band, -2**31)
+            high = min(int(keys[last - 1] >> 32) + band, 2**31 - 1)
+            start = int(np.searchsorted(keys, low << 32, side="left"))
+            stop = int(np.searchsorted(keys, (high << 32) + 2**32 - 1, side="right"))
+            tasks.append((shared, bodies.count, start, stop, first, last))
+        found = self._submit(_detect_task, tasks)
+        contacts = np.concatenate(found) if found else np.empty(0, dtype=CONTACT_DTYPE)
+        if len(contacts) == 0:
+            solver.reset()
+            return contacts
+        contacts = contacts[np.lexsort((contacts["b"], contacts["a"]))]
+
+        count = bodies.count
+        pair_keys = contacts["a"] * count + contacts["b"]
+        normal_impulse, tangent_impulse = solver.warm_start(pair_keys, count)
+        _, island, island_sizes = np.unique(_islands(contacts, bodies.column("mass")),
+                                            return_inverse=True, return_counts=True)
+        # islands split into runs with about the same number of contacts, same as the tile order
+        cuts = np.searchsorted(np.cumsum(island_sizes), np.arange(1, self.workers) * len(contacts) // self.workers,
+                               side="right")
+        task_of_contact = np.searchsorted(cuts, island, side="right")
+        selected = [mask for mask in (task_of_contact == task for task in range(self.workers)) if np.any(mask)]
+        settings = (solver.iterations, solver.restitution, solver.friction,
+                    solver.bounce_threshold, solver.slop, solver.correction)
+        resolved = self._submit(_resolve_task, [
+            (shared, count, settings, contacts[mask], normal_impulse[mask], tangent_impulse[mask])
+            for mask in selected
+        ])
+        for mask, (normal, closing_speed, tangent) in zip(selected, resolved):
+            contacts["impulse"][mask] = normal
+            contacts["closing_speed"][mask] = closing_speed
+            tangent_impulse[mask] = tangent
+        solver.remember(pair_keys, count, contacts["impulse"], tangent_impulse)
+        return contacts
+
+    def close(self):
+        """stop the worker processes and free the shared memory, the body_state must not be used afterwards,
+        also done when the sharding is garbage collected"""
+        if self._executor is not None:
+            self._executor_finalizer.detach()
+            self._executor.shutdown()
+            self._executor = None
+        self.allocator.close()
+
+
+def _islands(contacts:np.ndarray, mass:np.ndarray) -> np.ndarray: # pylint: disable=too-many-locals
+    """label every contact with its island, the lowest row in it, contacts connected through movable bodies share an island,
+    immovable bodies don't connect anything, the impulses they get are thrown away anyway"""
+    a, b = contacts["a"], contacts["b"]
+    movable_a = mass[a] > 0
+    linked = movable_a & (mass[b] > 0)
+    # connected components of the bodies in linked contacts, numbered compactly
+    bodies, edges = np.unique(np.concatenate((a[linked], b[linked])), return_inverse=True)
+    first, second = edges[:linked.sum()], edges[linked.sum():]
+    label = np.arange(len(bodies))
+    # hook every label onto the lowest label it is linked to, then jump pointers until flat
+    while True:
+        label_first, label_second = label[first], label[second]
+        if np.array_equal(label_first, label_second):
+            break
+        lowest = np.minimum(label_first, label_second)
+        np.minimum.at(label, label_first, lowest)
+        np.minimum.at(label, label_second, lowest)
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+    # a contact's island is the one of its movable body, which is an island of its own if it's in no linked contact
+    movable = np.where(movable_a, a, b)
+    index = np.minimum(np.searchsorted(bodies, movable), max(len(bodies) - 1, 0))
+    found = bodies[index] == movable if len(bodies) > 0 else np.zeros(len(movable), dtype=bool)
+    return np.where(found, bodies[label[index]] if len(bodies) > 0 else movable, movable)
+
+
+def _integrate_task(shared:dict[str, shared_array], # pylint: disable=too-many-arguments,too-many-positional-arguments
+                    count:int,
+                    first:int,
+                    last:int,
+                    time_delta:float,
+                    gravitational_parameter:float,
+                    origin:np.ndarray,
+                    tile_size:float) -> tuple[np.ndarray, np.ndarray]:
+    """worker side of `region_sharding.integrate`, returns the places in the tile order of bodies that changed tile,
+    and their new tile keys"""
+    columns = map_shared_arrays(shared, count)
+    rows = columns["tile_order"][first:last]
+    position, velocity, force = columns["position"][rows], columns["velocity"][rows], columns["force"][rows]
+    integrate_bodies(position, velocity, force, columns["mass"][rows], time_delta,
+                     gravitational_parameter=gravitational_parameter, origin=origin)
+    columns["position"][rows], columns["velocity"][rows], columns["force"][rows] = position, velocity, force
+    keys = tile_keys(position, tile_size)
+    moved = np.flatnonzero(keys != columns["tile_key"][first:last])
+    return first + moved, keys[moved]
+
+
+def _detect_task(shared:dict[str, shared_array], # pylint: disable=too-many-arguments,too-many-positional-arguments
+                 count:int,
+                 start:int,
+                 stop:int,
+                 first:int,
+                 last:int) -> np.ndarray:
+    """worker side of the detection in `region_sharding.resolve_contacts`,
+    the bodies at [first, last) of the tile order are this worker's, [start, stop) also includes their ghosts"""
+    columns = map_shared_arrays(shared, count)
+    by_row = np.argsort(columns["tile_order"][start:stop])
+    rows = columns["tile_order"][start:stop][by_row] # sorted, so local rows are in the same order as the global ones
+    own = (by_row >= first - start) & (by_row < last - start)
+    local = {name: columns[name][rows] for name in _DETECTION_COLUMNS}
+    a, b = find_pairs(local["position"], local["radius"])
+    owned = own[a] # a < b, so this is the lower row
+    contacts = detect_contacts(local["position"], local["mass"], local["rotation"], local["radius"], local["extent"],
+                               pairs=(a[owned], b[owned]))
+    contacts["a"], contacts["b"] = rows[contacts["a"]], rows[contacts["b"]]
+    return contacts
+
+
+def _resolve_task(shared:dict[str, shared_array], # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+                  count:int,
+                  settings:tuple,
+                  contacts:np.ndarray,
+                  normal_impulse:np.ndarray,
+                  tangent_impulse:np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """worker side of the resolution in `region_sharding.resolve_contacts`, `contacts` are whole islands"""
+    columns = map_shared_arrays(shared, count)
+    iterations, restitution, friction, bounce_threshold, slop, correction = settings
+    solver = contact_solver(iterations, restitution=restitution, friction=friction,
+                            bounce_threshold=bounce_threshold, slop=slop, correction=correction)
+    rows = np.unique(np.concatenate((contacts["a"], contacts["b"])))
+    contacts["a"], contacts["b"] = np.searchsorted(rows, contacts["a"]), np.searchsorted(rows, contacts["b"])
+    position, velocity, mass = columns["position"][rows], columns["velocity"][rows], columns["mass"][rows]
+    tangent_impulse = solver.resolve(position, velocity, mass, contacts, (normal_impulse, tangent_impulse))
+    movable = mass > 0 # immovable bodies can be in several islands, and never change anyway
+    columns["position"][rows[movable]], columns["velocity"][rows[movable]] = position[movable], velocity[movable]
+    return contacts["impulse"], contacts["closing_speed"], tangent_impulse
@@ -0,0 +1,139 @@
+"""Runtime health and heat of every ship, updated for all ships at once"""
+import numpy as np
+from physics.physics_object import physics_object
+from .component_table import component_table
+from .game_objects.ship import ship
+
+DESTROYED_BY_OVERHEAT = 1
+DESTROYED_BY_DAMAGE = 2
+
+DESTRUCTION_EVENT_DTYPE = np.dtype([
+    ("slot", "<i8"), # object_handle of the destroyed ship
+    ("generation", "<i8"),
+    ("owner", "<i4"),
+    ("cause", "u1"), # DESTROYED_BY_*
+])
+'''one destroyed ship, emitted by `ship_status.update`'''
+
+# thruster order in the throttle and thrust columns
+FORWARD, BACKWARD, RIGHT_STRAFE, LEFT_STRAFE = range(4)
+
+
+class ship_status(component_table):
+    """Health, heat and throttle of every ship in the game world, as numpy columns.
+
+    Rows that aren't ships (asteroids, projectiles) are masked out by the `is_ship` column.
+    """
+    def __init__(self, heat_per_newton_second:float = 1e-6, overheat_damage_rate:float = 1.0):
+        """Ship status table
+
+        Args:
+            heat_per_newton_second (float, optional): heat generated per newton of thrust per second. Defaults to 1e-6.
+            overheat_damage_rate (float, optional): health lost per second, per unit of heat above capacity. Defaults to 1.0.
+        """
+        super().__init__({
+            "is_ship": (np.bool_, ()),
+            "destroyed": (np.bool_, ()), # already reported, waiting to be despawned
+            "owner": (np.int32, ()),
+            "slot": (np.int64, ()),
+            "generation": (np.int64, ()),
+            "health": (np.float64, ()),
+            "heat": (np.float64, ()),
+            "max_health": (np.float64, ()),
+            "heat_capacity": (np.float64, ()),
+            "heat_dissipation": (np.float64, ()),
+            "thrust": (np.float64, (4,)), # max thrust per thruster, newtons
+            "throttle": (np.float64, (4,)), # 0-1 per thruster, set by whatever is flying the ship
+        })
+        self.heat_per_newton_second = heat_per_newton_second
+        self.overheat_damage_rate = overheat_damage_rate
+
+    def init_row(self, obj:physics_object, row:int):
+        """fill in a freshly spawned ship's status from its config, other objects are left masked out
+
+        Args:
+            obj (physics_object): the new object
+            row (int): its row
+        """
+        if not isinstance(obj, ship):
+            return
+        config = obj.config
+        columns = self._columns
+        columns["is_ship"][row] = True
+        columns["owner"][row] = obj.owned_by
+        columns["slot"][row], columns["generation"][row] = obj.handle
+        columns["health"][row] = config.max_health
+        columns["max_health"][row] = config.max_health
+        columns["heat_capacity"][row] = config.heat_capacity
+        columns["heat_dissipation"][row] = config.heat_dissipation
+        columns["thrust"][row] = (config.forward_thrust, config.backward_thrust,
+                                  config.right_strafe_thrust, config.left_strafe_thrust)
+
+    def update(self, time_delta:float) -> np.ndarray:
+        """dissipate heat, add thrust heat, apply overheat damage and find destroyed ships, for every ship at once
+
+        Args:
+            time_delta (float): time since last update in seconds
+
+        Returns:
+            np.ndarray: DESTRUCTION_EVENT_DTYPE array of ships destroyed during this update
+        """
+        is_ship = self.column("is_ship")
+        heat = self.column("heat")
+        health = self.column("health")
+        heat_capacity = self.column("heat_capacity")
+
+        thrust_heat = np.einsum("ij,ij->i", self.column("throttle"), self.column("thrust")) * self.heat_per_newton_second
+        np.maximum(heat + (thrust_heat - self.column("heat_dissipation")) * time_delta, 0, out=heat)
+        overheat = np.maximum(heat - heat_capacity, 0)
+        health -= overheat * (self.overheat_damage_rate * time_delta)
+        return self._collect_destroyed(is_ship, overheat)
+
+    def thrust_forces(self, rotation:np.ndarray) -> np.ndarray:
+        """world-space thrust force of every row, from its throttle, zero for anything that isn't a working ship
+
+        Forward is the direction the viewer draws a ship pointing in, (-sin, cos) of its rotation,
+        right strafe is 90 degrees clockwise from that.
+
+        Args:
+            rotation (np.ndarray): rotation of every row in radians, e.g. the body_state rotation column
+
+        Returns:
+            np.ndarray: (count, 2) forces in newtons
+        """
+        throttled = self.column("throttle") * self.column("thrust")
+        throttled[self.column("destroyed")] = 0
+        forward = throttled[:, FORWARD] - throttled[:, BACKWARD]
+        right = throttled[:, RIGHT_STRAFE] - throttled[:, LEFT_STRAFE]
+        sin, cos = np.sin(rotation), np.cos(rotation)
+        return np.stack((cos * right - sin * forward, sin * right + cos * forward), axis=1)
+
+    def apply_damage(self, rows:np.ndarray, amounts:np.ndarray):
+        """damage ships from outside (collisions, weapons), rows that aren't ships are ignored
+
+        Args:
+            rows (np.ndarray): rows of the damaged objects, may repeat
+            amounts (np.ndarray): damage per entry in `rows`
+        """
+        rows = np.asarray(rows)
+        amounts = np.where(self._columns["is_ship"][rows], amounts, 0)
+        np.subtract.at(self._columns["health"], rows, amounts)
+
+    def collect_destroyed(self) -> np.ndarray:
+        """find ships destroyed by `apply_damage` since the last update
+
+        Returns:
+            np.ndarray: DESTRUCTION_EVENT_DTYPE array of newly destroyed ships
+        """
+        return self._collect_destroyed(self.column("is_ship"), np.zeros(self.count))
+
+    def _collect_destroyed(self, is_ship:np.ndarray, overheat:np.ndarray) -> np.ndarray:
+        destroyed = self.column("destroyed")
+        newly_destroyed = np.flatnonzero(is_ship & ~destroyed & (self.column("health") <= 0))
+        destroyed[newly_destroyed] = True
+        events = np.empty(len(newly_destroyed), dtype=DESTRUCTION_EVENT_DTYPE)
+        events["slot"] = self.column("slot")[newly_destroyed]
+        events["generation"] = self.column("generation")[newly_destroyed]
+        events["owner"] = self.column("owner")[newly_destroyed]
+        events["cause"] = np.where(overheat[newly_destroyed] > 0, DESTROYED_BY_OVERHEAT, DESTROYED_BY_DAMAGE)
+        return events
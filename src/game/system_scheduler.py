@@ -0,0 +1,127 @@
+"""Runs the systems that make up an update in a safe order, independent ones at the same time"""
+from __future__ import annotations
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+@dataclass(frozen=True)
+class scheduled_system:
+    """A step of the update, and the data it touches"""
+    name: str
+    run: Callable[[float], None] # called with the time delta
+    reads: frozenset[str]
+    writes: frozenset[str]
+
+
+def _overlaps(first:frozenset[str], second:frozenset[str]) -> bool:
+    """whether two sets of accesses touch the same data, "body_state" covers "body_state.position" and so on"""
+    for name in first:
+        for other in second:
+            if name == other or other.startswith(name + ".") or name.startswith(other + "."):
+                return True
+    return False
+
+
+class system_scheduler:
+    """Orders systems by the data they declare, and runs the ones that don't conflict concurrently.
+
+    Data is named by strings, by convention "table.column" (e.g. "body_state.position"),
+    a bare "table" covers every column of it. Two systems conflict if one writes something the other reads or writes,
+    conflicting systems run in the order they were added, everything else is free to run at the same time.
+    numpy releases the GIL for most array work, so threads are enough for systems to really overlap.
+    """
+    def __init__(self, max_workers:int = 1):
+        """System scheduler
+
+        Args:
+            max_workers (int, optional): threads to run independent systems on, 1 runs everything in order on the calling thread. Defaults to 1.
+        """
+        self.max_workers = max_workers
+        self.systems:list[scheduled_system] = []
+        self._stages:list[list[scheduled_system]] | None = None
+        self._executor:ThreadPoolExecutor | None = None
+        self._finalizer:weakref.finalize | None = None
+        self.timings:dict[str, float] = {}
+        '''seconds each system took during the last `run`'''
+        self.total_timings:dict[str, float] = {}
+        '''seconds each system took over every `run` so far'''
+
+    def add_system(self,
+                   name:str,
+                   run:Callable[[float], None],
+                   *,
+                   reads:tuple[str, ...] = (),
+                   writes:tuple[str, ...] = ()):
+        """add a system, it runs after every earlier system it conflicts with
+
+        Args:
+            name (str): unique name, used for the timings
+            run (Callable[[float], None]): the system, called with the time delta
+            reads (tuple[str, ...], optional): data the system only reads. Defaults to ().
+            writes (tuple[str, ...], optional): data the system writes (and may read). Defaults to ().
+        """
+        if any(existing.name == name for existing in self.systems):
+            raise ValueError(f"there is already a system called {name}")
+        self.systems.append(scheduled_system(name, run, frozenset(reads), frozenset(writes)))
+        self.total_timings[name] = 0.0
+        self._stages = None
+
+    @property
+    def stages(self) -> list[list[scheduled_system]]:
+        """the systems grouped into stages, the systems in a stage don't conflict with each other
+        and only depend on systems in earlier stages"""
+        if self._stages is None:
+            levels:list[int] = []
+            for index, current in enumerate(self.systems):
+                level = 0
+                for earlier_index in range(index):
+                    earlier = self.systems[earlier_index]
+                    if _overlaps(earlier.writes, current.reads | current.writes) or _overlaps(current.writes, earlier.reads):
+                        level = max(level, levels[earlier_index] + 1)
+                levels.append(level)
+            self._stages = [[] for _ in range(max(levels, default=-1) + 1)]
+            for level, current in zip(levels, self.systems):
+                self._stages[level].append(current)
+        return self._stages
+
+    def run(self, time_delta:float):
+        """run every system once
+
+        Args:
+            time_delta (float): time since last update in seconds, passed on to every system
+        """
+        for stage in self.stages:
+            if len(stage) == 1 or self.max_workers <= 1:
+                for current in stage:
+                    self._run_timed(current, time_delta)
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="system")
+                # stop the threads even if the owner never calls `close`
+                self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False)
+            futures = [self._executor.submit(self._run_timed, current, time_delta) for current in stage]
+            for future in futures:
+                future.result() # re-raises anything a system raised
+
+    def _run_timed(self, current:scheduled_system, time_delta:float):
+        start = time.perf_counter()
+        current.run(time_delta)
+        elapsed = time.perf_counter() - start
+        # each system only ever writes its own entry, so concurrent systems don't race here
+        self.timings[current.name] = elapsed
+        self.total_timings[current.name] += elapsed
+
+    def __enter__(self) -> system_scheduler:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """stop the worker threads, if any were started, they are also stopped when the scheduler is garbage collected"""
+        if self._executor is not None:
+            self._finalizer.detach()
+            self._executor.shutdown()
+            self._executor = None
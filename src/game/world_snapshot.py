@@ -0,0 +1,53 @@
+"""Immutable copy of everything needed to draw the game world, cheap to send to another process"""
+from dataclasses import dataclass
+import numpy as np
+from .object_registry import OBJECT_KINDS
+
+@dataclass(frozen=True)
+class world_snapshot: # pylint: disable=too-many-instance-attributes
+    """State of the game world at one tick, every array has one row per object and is read-only
+    """
+    tick: int
+    num_players: int
+    world_size: float
+    planet_radius: float
+    position: np.ndarray # (n, 2) meters from `origin`
+    rotation: np.ndarray # (n,) radians
+    radius: np.ndarray # (n,) bounding radius of the collider
+    extent: np.ndarray # (n, 2) (width, height) of rectangular colliders, (0, 0) for circles
+    kind: np.ndarray # (n,) index into object_registry.OBJECT_KINDS
+    owner: np.ndarray # (n,) player ID, -1 if nobody owns the object
+    origin: tuple[float, float] = (0.0, 0.0) # world position that `position` is relative to, see `body_state.origin`
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def bounding_box(self, kind:str) -> tuple[float,float,float,float] | None:
+        """bounding box of the positions of every object of one kind, in world coordinates
+
+        Args:
+            kind (str): one of object_registry.OBJECT_KINDS
+
+        Returns:
+            tuple[float,float,float,float] | None: (minx, maxx, miny, maxy), or None if there are no such objects
+        """
+        positions = self.position[self.kind == OBJECT_KINDS.index(kind)]
+        if len(positions) == 0:
+            return None
+        minx, miny = (positions.min(axis=0) + self.origin).tolist()
+        maxx, maxy = (positions.max(axis=0) + self.origin).tolist()
+        return (minx, maxx, miny, maxy)
+
+
+def frozen_copy(array:np.ndarray) -> np.ndarray:
+    """copy an array and make the copy read-only
+
+    Args:
+        array (np.ndarray): array to copy, usually a live column view
+
+    Returns:
+        np.ndarray: read-only copy
+    """
+    copy = np.array(array)
+    copy.flags.writeable = False
+    return copy
@@ -0,0 +1,84 @@
+"""Camera math shared by the pygame viewer and the numpy rasterizer, no pygame needed
+
+A camera is (scale, (x_offset, y_offset)): world positions are shifted by the offset (the point the camera looks at),
+scaled into pixels, then moved to the middle of the screen.
+"""
+import numpy as np
+
+def fit_camera(bounding_box:tuple[float,float,float,float],
+               screen_size:tuple[int,int],
+               min_extent:float = 1.0) -> tuple[float,tuple[float,float]]:
+    """find the camera that fits a bounding box on the screen
+
+    Args:
+        bounding_box (tuple[float,float,float,float]): (minx, maxx, miny, maxy) to fit, padding already included
+        screen_size (tuple[int,int]): (width, height) of the screen in pixels
+        min_extent (float, optional): smallest box size in meters, so a single object doesn't zoom in infinitely. Defaults to 1.0.
+
+    Returns:
+        tuple[float,tuple[float,float]]: (scale, (x_offset, y_offset))
+    """
+    minx, maxx, miny, maxy = bounding_box
+    bb_width = max(maxx - minx, min_extent)
+    bb_height = max(maxy - miny, min_extent)
+
+    # the correct scale will make the largest dimension of the bounding box fit the screen along that dimension
+    screen_width, screen_height = screen_size
+    if bb_height / screen_height > bb_width / screen_width:
+        # height is the limiting dimension
+        scale = screen_height / bb_height
+    else:
+        # width is the limiting dimension
+        scale = screen_width / bb_width
+
+    # the correct offset will center the bounding box on the screen
+    offset = ((maxx + minx) / 2, (maxy + miny) / 2)
+    return (scale, offset)
+
+def pad_bounding_box(bounding_box:tuple[float,float,float,float], padding:float) -> tuple[float,float,float,float]:
+    """grow a bounding box around its centre
+
+    Args:
+        bounding_box (tuple[float,float,float,float]): (minx, maxx, miny, maxy)
+        padding (float): fraction to grow each dimension by, e.g. 0.2 for 20%
+
+    Returns:
+        tuple[float,float,float,float]: the padded (minx, maxx, miny, maxy)
+    """
+    minx, maxx, miny, maxy = bounding_box
+    pad_x = (maxx - minx) * padding / 2
+    pad_y = (maxy - miny) * padding / 2
+    return (minx - pad_x, maxx + pad_x, miny - pad_y, maxy + pad_y)
+
+def whole_world_bounding_box(world_size:float, padding:float) -> tuple[float,float,float,float]:
+    """bounding box of the whole world, centred on the origin
+
+    Args:
+        world_size (float): world radius
+        padding (float): fraction of padding, e.g. 0.2 for 20%
+
+    Returns:
+        tuple[float,float,float,float]: (minx, maxx, miny, maxy)
+    """
+    half = world_size * (1 + padding / 2)
+    return (-half, half, -half, half)
+
+def world_to_screen(positions:np.ndarray,
+                    camera:tuple[float,tuple[float,float]],
+                    screen_size:tuple[int,int],
+                    origin:tuple[float,float] = (0.0, 0.0)) -> np.ndarray:
+    """project world positions onto the screen, for many positions at once
+
+    Args:
+        positions (np.ndarray): (n, 2) positions relative to `origin`, e.g. a snapshot's float32 positions
+        camera (tuple[float,tuple[float,float]]): (scale, (x_offset, y_offset)), the offset in world coordinates
+        screen_size (tuple[int,int]): (width, height) of the screen in pixels
+        origin (tuple[float,float], optional): world position the positions are relative to. Defaults to (0.0, 0.0).
+
+    Returns:
+        np.ndarray: (n, 2) screen positions in pixels
+    """
+    scale, offset = camera
+    # take the (big) origin out of the offset first, in float64, so the positions only lose precision far from the camera
+    local_offset = np.asarray(offset, dtype=np.float64) - np.asarray(origin, dtype=np.float64)
+    return (np.asarray(positions) - local_offset) * scale + np.asarray(screen_size) / 2
@@ -1,31 +1,32 @@
 """Class to display the game state on a pygame surface"""
-from typing import Callable
 import math
+import numpy as np
 import pygame
 import pygame.gfxdraw
 from game.gamerunner import game
+from game.world_snapshot import world_snapshot
 from math_lib.vector2 import vector2
-from physics.physics_object import physics_object, rect_collider
-# stuff for drawing
-from game.game_objects.ship import ship
+from game import object_registry
+from graphics_display import camera
 
 
 class game_viewer:
     """Class to display the game state on a pygame surface"""
-    def __init__(self, game_to_view:game, screen_size:tuple[int,int]):
+    def __init__(self, game_to_view:game | None, screen_size:tuple[int,int], num_players:int | None = None):
         """Class to display the game state on a pygame surface
 
         Args:
-            game_to_view (game): the game to display
+            game_to_view (game | None): the game to display, or None to only ever render snapshots
             screen_size (tuple[int,int]): the size of the screen to display on (width, height)
+            num_players (int | None, optional): number of players, needed when there is no game. Defaults to the game's.
         """
         self.game = game_to_view
         self.screen = pygame.Surface(screen_size)
 
         #camera parameters
         self._camera:tuple[float,tuple[float,float]] = (1.0, (0.0, 0.0))
-        # ^ (scale, (x_offset, y_offset))
-        # "Camera" is sort of inverted, as in object are offset and scaled by the `camera`
+        # ^ (scale, (x_offset, y_offset)), see graphics_display.camera
+        # the offset is the world position shown in the middle of the screen
 
         # find random-ish colours for the players
         # white is reserved for non-player things
@@ -37,31 +38,34 @@ class game_viewer:
             (128,255,128),
             (255,128,128)
         ]
-        assert len(self.game.players) < len(self.playercols), \
+        if num_players is None:
+            num_players = len(self.game.players)
+        assert num_players < len(self.playercols), \
             "Not enough playercolours, maybe make it generated now instead of hardcoded"
 
-    def _find_bounding_box(self, obj_filter:Callable[[physics_object],bool]) -> tuple[float,float,float,float]:
-        """Find the bounding box of all objects in the game world that pass the filter
+    def _find_bounding_box(self, snapshot:world_snapshot | None = None) -> tuple[float,float,float,float]:
+        """Find the bounding box of all ships in the game world,
+        from the world's per-kind index, or from a snapshot's columns
 
         Args:
-            obj_filter (Callable[[physics_object],bool]): Function that takes a physics_object and returns whether it should be considered in the bounding box calculation
+            snapshot (world_snapshot | None, optional): snapshot to use instead of the live game. Defaults to None.
 
         Returns:
-            tuple[float,float,float,float]: (minx, maxx, miny, maxy) of the bounding box, or (0,0,0,0) if there are no objects
+            tuple[float,float,float,float]: (minx, maxx, miny, maxy) of the bounding box, or (0,0,0,0) if there are no ships
         """
-        objects_of_interest = list(filter(obj_filter, self.game.game_world.physics_objects))
-        if len(objects_of_interest) == 0:
+        if snapshot is None:
+            bounding_box = self.game.game_world.registry.bounding_box(kind=object_registry.SHIP)
+        else:
+            bounding_box = snapshot.bounding_box(object_registry.SHIP)
+        if bounding_box is None:
             return (0,0,0,0)
-        minx = min(obj.position.x for obj in objects_of_interest)
-        maxx = max(obj.position.x for obj in objects_of_interest)
-        miny = min(obj.position.y for obj in objects_of_interest)
-        maxy = max(obj.position.y for obj in objects_of_interest)
-        return (minx, maxx, miny, maxy)
+        return bounding_box
 
-    def find_scale_offset(self,                 # pylint: disable=too-many-locals
+    def find_scale_offset(self,
                           view_whole_world:bool =False,
                           padding_percent:float = 20,
-                          smoothness:float = 0.9):
+                          smoothness:float = 0.9,
+                          snapshot:world_snapshot | None = None):
         """Find an optimal camera scale and offset for the current game state,
         updates self._camera to match
 
@@ -69,48 +73,16 @@ class game_viewer:
             view_whole_world (bool, optional): whether to view the whole game world. Defaults to False.
             padding_percent (float, optional): add this percent of the screen as blank space on either side of the active area. Defaults to 20%.
             smoothness (float, optional): how much to smooth the camera movement, **must** be <1 Defaults to 0.9.
+            snapshot (world_snapshot | None, optional): fit the camera to this snapshot instead of the live game. Defaults to None.
         """
         # find the bounding box of all objects, then find the scale and offset to fit that box on the screen
         padding_percent /= 100 # convert to decimal
-        def filter_objects(obj:physics_object) -> bool:
-            """return true if and only if this object should be considered in the camera calculation"""
-            if isinstance(obj, ship):
-                return True
-            return False
         if view_whole_world:
-            bounding_box = (
-                (-self.game.game_world.world_size)*((1+padding_percent/2)),
-                (self.game.game_world.world_size)*((1+padding_percent/2)),
-                (-self.game.game_world.world_size)*((1+padding_percent/2)),
-                (self.game.game_world.world_size)*((1+padding_percent/2))
-            )
-        else:
-            bounding_box = self._find_bounding_box(filter_objects)
-            bounding_box = (
-                bounding_box[0] * (1+padding_percent),
-                bounding_box[1] * (1+padding_percent),
-                bounding_box[2] * (1+padding_percent),
-                bounding_box[3] * (1+padding_percent)
-            )
-            # ^ add padding, could probably be done more efficiently
-
-        # now, find the scale and offset
-        minx, maxx, miny, maxy = bounding_box
-        bb_width = maxx - minx
-        bb_height = maxy - miny
-
-        # find the scale and offset
-        # the correct scale will make the largest dimension of the bounding box fit the screen along that dimension
-        screen_width, screen_height = self.screen.get_size()
-        if bb_height / screen_height > bb_width / screen_width:
-            # height is the limiting dimension
-            scale = screen_height / bb_height
+            world_size = self.game.game_world.world_size if snapshot is None else snapshot.world_size
+            bounding_box = camera.whole_world_bounding_box(world_size, padding_percent)
         else:
-            # width is the limiting dimension
-            scale = screen_width / bb_width
-
-        # the correct offset will center the bounding box on the screen
-        offset = (-(maxx + minx) / 2, -(maxy + miny) / 2)
+            bounding_box = camera.pad_bounding_box(self._find_bounding_box(snapshot), padding_percent)
+        scale, offset = camera.fit_camera(bounding_box, self.screen.get_size())
 
         # now interpolate with smoothness
         final_scale = self._camera[0] * smoothness + scale * (1-smoothness)
@@ -120,16 +92,38 @@ class game_viewer:
     def render_to_self(self):
         """renders the game data to self.screen
         """
-        self.screen.fill((0,0,0)) # reset the screen
-        for obj in self.game.game_world.physics_objects:
-            draw_coords = (((obj.position - vector2(*self._camera[1])) *self._camera[0]) \
-                + vector2(*self.screen.get_size()) / 2).to_tuple()
+        self.render_snapshot(self.game.snapshot())
 
-            col_to_draw = (255,255,255)
-            if isinstance(obj, ship):
-                col_to_draw = self.playercols[obj.owned_by]
+    def render_snapshot(self, snapshot:world_snapshot): # pylint: disable=too-many-locals
+        """renders a snapshot of the game to self.screen, works without access to the game itself
 
-            render_size = obj.collider.radius * self._camera[0]
+        Args:
+            snapshot (world_snapshot): the snapshot to draw
+        """
+        self.screen.fill((0,0,0)) # reset the screen
+        if snapshot.planet_radius > 0:
+            planet_coords = tuple(camera.world_to_screen(np.zeros((1, 2)), self._camera, self.screen.get_size())[0].tolist())
+            pygame.draw.circle(
+                surface=self.screen,
+                color=(96,96,96),
+                center=planet_coords,
+                radius=snapshot.planet_radius * self._camera[0],
+                )
+        # unowned things first, then every player's objects on top
+        draw_order = np.argsort(snapshot.owner, kind="stable").tolist()
+        screen_positions = camera.world_to_screen(
+            snapshot.position, self._camera, self.screen.get_size(), snapshot.origin).tolist()
+        rotations = snapshot.rotation.tolist()
+        radii = snapshot.radius.tolist()
+        extents = snapshot.extent.tolist()
+        owners = snapshot.owner.tolist()
+        for row in draw_order:
+            col_to_draw = (255,255,255) if owners[row] < 0 else self.playercols[owners[row]]
+            rotation = rotations[row]
+            width, height = extents[row]
+            draw_coords = tuple(screen_positions[row])
+
+            render_size = radii[row] * self._camera[0]
             # if it's too far out of bounds, skip the draw
             if draw_coords[0] + render_size < 0 or draw_coords[0] - render_size > self.screen.get_width():
                 continue
@@ -150,20 +144,20 @@ class game_viewer:
                     self.screen,
                     col_to_draw,
                     draw_coords,
-                    (draw_coords[0] - math.sin(obj.rotation) * 5, draw_coords[1] + math.cos(obj.rotation) * 5)
+                    (draw_coords[0] - math.sin(rotation) * 5, draw_coords[1] + math.cos(rotation) * 5)
                 )
             else:
-                if isinstance(obj.collider, rect_collider):
+                if width > 0:
                     # make a polygon of the coordinates, rotated by the object's rotation, then draw it
                     rect_points = [
-                        vector2(obj.collider.width / 2, obj.collider.height / 2),
-                        vector2(obj.collider.width / 2, -obj.collider.height / 2),
-                        vector2(-obj.collider.width / 2, -obj.collider.height / 2),
-                        vector2(-obj.collider.width / 2, obj.collider.height / 2),
+                        vector2(width / 2, height / 2),
+                        vector2(width / 2, -height / 2),
+                        vector2(-width / 2, -height / 2),
+                        vector2(-width / 2, height / 2),
                     ]
                     # now rotate, scale, and offset the points
                     for i in range(len(rect_points)): # pylint: disable=consider-using-enumerate # because we're modifying the list
-                        rect_points[i].rotate_rad(obj.rotation)
+                        rect_points[i].rotate_rad(rotation)
                         rect_points[i] *= self._camera[0]
                         rect_points[i] += vector2(*draw_coords)
                     # now draw the polygon
@@ -177,7 +171,7 @@ class game_viewer:
                         self.screen,
                         (0,0,0),
                         draw_coords,
-                        (draw_coords[0] - math.sin(obj.rotation) * 5, draw_coords[1] + math.cos(obj.rotation) * 5)
+                        (draw_coords[0] - math.sin(rotation) * 5, draw_coords[1] + math.cos(rotation) * 5)
                     )
 
                 else:
@@ -186,5 +180,5 @@ class game_viewer:
                         surface=self.screen,
                         color=col_to_draw,
                         center=draw_coords,
-                        radius=obj.collider.radius * self._camera[0],
+                        radius=radii[row] * self._camera[0],
                         )
@@ -0,0 +1,276 @@
+"""Low resolution pixel observations for vision based agents, rasterized with numpy only (no pygame, no display)
+
+Many games and many cameras are drawn in one call: every (camera, object) pair is projected at once,
+then each object is splatted as a small square stamp of pixels that gets masked down to a circle or a rotated rect.
+Images are (channels, height, width) uint8, 255 where something is, 0 where nothing is.
+"""
+from dataclasses import dataclass
+import numpy as np
+from game import object_registry
+from game.world_snapshot import world_snapshot
+from graphics_display import camera
+
+OBSERVATION_CHANNELS = ("neutral", "own_ships", "other_ships", "projectiles")
+'''channel order of every image, the planet and asteroids are neutral'''
+NEUTRAL_CHANNEL, OWN_SHIPS_CHANNEL, OTHER_SHIPS_CHANNEL, PROJECTILES_CHANNEL = range(len(OBSERVATION_CHANNELS))
+
+_SHIP_KIND = object_registry.OBJECT_KINDS.index(object_registry.SHIP)
+_PROJECTILE_KIND = object_registry.OBJECT_KINDS.index(object_registry.PROJECTILE)
+_NEUTRAL_KIND = object_registry.OBJECT_KINDS.index(object_registry.ASTEROID)
+
+_MAX_CHUNK_PIXELS = 1 << 20 # pixels tested per numpy call, keeps temporaries in cache-ish sizes
+
+
+@dataclass
+class camera_batch:
+    """Many cameras, one row each, see `global_cameras` and `ship_cameras`"""
+    game: np.ndarray # (k,) index of the snapshot each camera looks at
+    center: np.ndarray # (k, 2) world position in the middle of the image
+    scale: np.ndarray # (k,) pixels per meter
+    rotation: np.ndarray # (k,) radians the world is rotated by before drawing, 0 for north up
+    owner: np.ndarray # (k,) player whose ships go in the own ships channel, -1 for nobody
+
+    def __len__(self) -> int:
+        return len(self.game)
+
+
+def global_cameras(snapshots:list[world_snapshot],
+                   image_size:tuple[int,int],
+                   *,
+                   view_whole_world:bool = False,
+                   padding_percent:float = 20,
+                   owner:int = -1) -> camera_batch:
+    """one camera per game, fitted the same way `game_viewer.find_scale_offset` fits its camera (without smoothing)
+
+    Args:
+        snapshots (list[world_snapshot]): the games to look at
+        image_size (tuple[int,int]): (width, height) of the images
+        view_whole_world (bool, optional): fit the whole world instead of just the ships. Defaults to False.
+        padding_percent (float, optional): blank space around the fitted area. Defaults to 20.
+        owner (int, optional): player whose ships go in the own ships channel, -1 for nobody. Defaults to -1.
+
+    Returns:
+        camera_batch: one camera per snapshot
+    """
+    padding = padding_percent / 100
+    cameras = []
+    for snapshot in snapshots:
+        if view_whole_world:
+            bounding_box = camera.whole_world_bounding_box(snapshot.world_size, padding)
+        else:
+            bounding_box = snapshot.bounding_box(object_registry.SHIP) or (0,0,0,0)
+            bounding_box = camera.pad_bounding_box(bounding_box, padding)
+        cameras.append(camera.fit_camera(bounding_box, image_size))
+    amount = len(snapshots)
+    return camera_batch(
+        game=np.arange(amount),
+        center=np.array([offset for _, offset in cameras], dtype=np.float64).reshape(amount, 2),
+        scale=np.array([scale for scale, _ in cameras], dtype=np.float64),
+        rotation=np.zeros(amount),
+        owner=np.full(amount, owner),
+    )
+
+def ship_cameras(snapshots:list[world_snapshot],
+                 image_size:tuple[int,int],
+                 view_radius:float) -> tuple[camera_batch, np.ndarray]:
+    """one egocentric camera per ship: centred on the ship, turned so the ship always points up the image
+
+    Args:
+        snapshots (list[world_snapshot]): the games to look at
+        image_size (tuple[int,int]): (width, height) of the images
+        view_radius (float): meters from the ship to the nearest image edge
+
+    Returns:
+        tuple[camera_batch, np.ndarray]: the cameras, and the snapshot row of each camera's ship
+    """
+    games, rows = [], []
+    for game_index, snapshot in enumerate(snapshots):
+        ship_rows = np.flatnonzero(snapshot.kind == _SHIP_KIND)
+        games.append(np.full(len(ship_rows), game_index))
+        rows.append(ship_rows)
+    games = np.concatenate(games) if games else np.zeros(0, dtype=np.int64)
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    center = np.zeros((len(rows), 2))
+    rotation = np.zeros(len(rows))
+    owner = np.zeros(len(rows), dtype=np.int64)
+    for game_index, snapshot in enumerate(snapshots):
+        mine = games == game_index
+        center[mine] = snapshot.position[rows[mine]] + snapshot.origin
+        # ships point along (-sin, cos) of their rotation, which is straight down the image when unrotated
+        rotation[mine] = -snapshot.rotation[rows[mine]] - np.pi
+        owner[mine] = snapshot.owner[rows[mine]]
+    cameras = camera_batch(
+        game=games,
+        center=center,
+        scale=np.full(len(rows), min(image_size) / (2 * view_radius)),
+        rotation=rotation,
+        owner=owner,
+    )
+    return cameras, rows
+
+
+class pixel_rasterizer:
+    """Draws batches of cameras into preallocated (cameras, channels, height, width) uint8 arrays
+    """
+    def __init__(self, image_size:tuple[int,int] = (64, 64)):
+        """Pixel rasterizer
+
+        Args:
+            image_size (tuple[int,int], optional): (width, height) of the images. Defaults to (64, 64).
+        """
+        self.image_size = image_size
+
+    def allocate(self, num_cameras:int) -> np.ndarray:
+        """make an image array to render into, reuse it every frame
+
+        Args:
+            num_cameras (int): number of images
+
+        Returns:
+            np.ndarray: (num_cameras, channels, height, width) uint8 zeros
+        """
+        width, height = self.image_size
+        return np.zeros((num_cameras, len(OBSERVATION_CHANNELS), height, width), dtype=np.uint8)
+
+    def render(self, snapshots:list[world_snapshot], cameras:camera_batch, out:np.ndarray) -> np.ndarray: # pylint: disable=too-many-locals
+        """draw what every camera sees, overwriting `out`
+
+        Args:
+            snapshots (list[world_snapshot]): the games, indexed by `cameras.game`
+            cameras (camera_batch): the cameras, one image each
+            out (np.ndarray): (len(cameras), channels, height, width) contiguous uint8 array, see `allocate`
+
+        Returns:
+            np.ndarray: `out`
+        """
+        width, height = self.image_size
+        assert out.shape == (len(cameras), len(OBSERVATION_CHANNELS), height, width) and out.flags.c_contiguous, \
+            "out must come from `allocate` with the same number of cameras"
+        out.fill(0)
+        if len(cameras) == 0:
+            return out
+        objects = _concatenate(snapshots)
+        pairs = _project(objects, cameras, self.image_size)
+        flat_out = out.reshape(-1)
+
+        # stamps are (2 * half + 1) pixels square, halves are rounded up to powers of two so there are only a few sizes
+        half = np.ceil(pairs["bound"]).astype(np.int64)
+        half = np.where(half > 0, 1 << np.ceil(np.log2(np.maximum(half, 1))).astype(np.int64), 0)
+        too_big = half > max(width, height)
+        for size in np.unique(half[~too_big]).tolist():
+            selected = np.flatnonzero((half == size) & ~too_big)
+            offsets = np.arange(-size, size + 1)
+            pixel_x = np.floor(pairs["x"][selected]).astype(np.int64)[:, None, None] + offsets[None, None, :]
+            pixel_y = np.floor(pairs["y"][selected]).astype(np.int64)[:, None, None] + offsets[None, :, None]
+            chunk = max(_MAX_CHUNK_PIXELS // len(offsets) ** 2, 1)
+            for start in range(0, len(selected), chunk):
+                part = slice(start, start + chunk)
+                self._splat(flat_out, pairs, selected[part], pixel_x[part], pixel_y[part], centre_pixel=size)
+        # anything bigger than the image (usually the planet) is tested against every pixel of the image instead
+        big = np.flatnonzero(too_big)
+        pixel_x = np.arange(width)[None, None, :]
+        pixel_y = np.arange(height)[None, :, None]
+        chunk = max(_MAX_CHUNK_PIXELS // (width * height), 1)
+        for start in range(0, len(big), chunk):
+            self._splat(flat_out, pairs, big[start:start + chunk], pixel_x, pixel_y, centre_pixel=None)
+        return out
+
+    def _splat(self, flat_out:np.ndarray, pairs:dict[str,np.ndarray], selected:np.ndarray, # pylint: disable=too-many-arguments,too-many-locals
+               pixel_x:np.ndarray, pixel_y:np.ndarray, *, centre_pixel:int | None):
+        """set every pixel (pixel_x, pixel_y) covered by the selected pairs' objects
+
+        pixel_x and pixel_y broadcast to (pairs, rows, columns), `centre_pixel` is the stamp index of the pixel
+        containing the object's centre, which is always set so tiny objects don't vanish
+        """
+        width, height = self.image_size
+        x = pairs["x"][selected][:, None, None]
+        y = pairs["y"][selected][:, None, None]
+        dx = pixel_x + 0.5 - x
+        dy = pixel_y + 0.5 - y
+        half_width = pairs["half_width"][selected][:, None, None]
+        half_height = pairs["half_height"][selected][:, None, None]
+        cos = pairs["cos"][selected][:, None, None]
+        sin = pairs["sin"][selected][:, None, None]
+        # rotate the pixel into the object's frame, the rect test only matters for rects (half_width > 0)
+        local_x = cos * dx + sin * dy
+        local_y = cos * dy - sin * dx
+        radius = pairs["radius"][selected][:, None, None]
+        covered = np.where(half_width > 0,
+                           (np.abs(local_x) <= half_width) & (np.abs(local_y) <= half_height),
+                           dx * dx + dy * dy <= radius * radius)
+        if centre_pixel is not None:
+            covered[:, centre_pixel, centre_pixel] = True
+        covered &= (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+        pair_index, _, _ = np.nonzero(covered)
+        pixel_x = np.broadcast_to(pixel_x, covered.shape)[covered]
+        pixel_y = np.broadcast_to(pixel_y, covered.shape)[covered]
+        plane = pairs["plane"][selected][pair_index] # image * channels + channel
+        flat_out[(plane * height + pixel_y) * width + pixel_x] = 255
+
+
+def _concatenate(snapshots:list[world_snapshot]) -> dict[str,np.ndarray]:
+    """stack every snapshot's objects into one set of columns, with the planet as an extra neutral circle"""
+    columns:dict[str,list[np.ndarray]] = {name: [] for name in ("position", "rotation", "radius", "extent", "kind", "owner")}
+    counts, origins = [], []
+    for snapshot in snapshots:
+        for name, values in columns.items():
+            values.append(getattr(snapshot, name))
+        count = len(snapshot)
+        origins.append(snapshot.origin)
+        if snapshot.planet_radius > 0:
+            columns["position"].append(-np.array([snapshot.origin])) # the planet sits at the world's origin
+            columns["rotation"].append(np.zeros(1))
+            columns["radius"].append(np.array([snapshot.planet_radius]))
+            columns["extent"].append(np.zeros((1, 2)))
+            columns["kind"].append(np.array([_NEUTRAL_KIND]))
+            columns["owner"].append(np.array([-1]))
+            count += 1
+        counts.append(count)
+    objects = {name: np.concatenate(values) for name, values in columns.items()}
+    objects["counts"] = np.array(counts, dtype=np.int64)
+    objects["origins"] = np.array(origins, dtype=np.float64).reshape(len(snapshots), 2)
+    objects["starts"] = np.cumsum(objects["counts"]) - objects["counts"]
+    return objects
+
+def _project(objects:dict[str,np.ndarray], cameras:camera_batch, image_size:tuple[int,int]) -> dict[str,np.ndarray]: # pylint: disable=too-many-locals
+    """pair every camera with every object in its game, project the pairs onto the image and drop the ones off screen"""
+    width, height = image_size
+    # every camera sees every object of its own game
+    per_camera = objects["counts"][cameras.game]
+    pair_camera = np.repeat(np.arange(len(cameras)), per_camera)
+    first_pair = np.cumsum(per_camera) - per_camera
+    pair_object = np.repeat(objects["starts"][cameras.game] - first_pair, per_camera) + np.arange(len(pair_camera))
+
+    scale = cameras.scale[pair_camera]
+    camera_cos = np.cos(cameras.rotation)[pair_camera]
+    camera_sin = np.sin(cameras.rotation)[pair_camera]
+    # cameras are in world coordinates, objects relative to their snapshot's origin
+    camera_center = cameras.center - objects["origins"][cameras.game]
+    relative = objects["position"][pair_object] - camera_center[pair_camera]
+    x = (camera_cos * relative[:, 0] - camera_sin * relative[:, 1]) * scale + width / 2
+    y = (camera_sin * relative[:, 0] + camera_cos * relative[:, 1]) * scale + height / 2
+
+    extent = objects["extent"][pair_object]
+    radius = objects["radius"][pair_object] * scale
+    half_width = extent[:, 0] * scale / 2
+    half_height = extent[:, 1] * scale / 2
+    bound = np.where(half_width > 0, np.hypot(half_width, half_height), radius)
+    visible = (x + bound >= 0) & (x - bound < width) & (y + bound >= 0) & (y - bound < height)
+
+    kind = objects["kind"][pair_object]
+    channel = np.where(kind == _SHIP_KIND,
+                       np.where(objects["owner"][pair_object] == cameras.owner[pair_camera], OWN_SHIPS_CHANNEL, OTHER_SHIPS_CHANNEL),
+                       np.where(kind == _PROJECTILE_KIND, PROJECTILES_CHANNEL, NEUTRAL_CHANNEL))
+    # rotation of the object on screen is its own rotation plus the camera's
+    object_rotation = objects["rotation"][pair_object] + cameras.rotation[pair_camera]
+    return {
+        "x": x[visible],
+        "y": y[visible],
+        "radius": radius[visible],
+        "half_width": half_width[visible],
+        "half_height": half_height[visible],
+        "bound": bound[visible],
+        "cos": np.cos(object_rotation[visible]),
+        "sin": np.sin(object_rotation[visible]),
+        "plane": (pair_camera * len(OBSERVATION_CHANNELS) + channel)[visible],
+    }
@@ -0,0 +1,167 @@
+"""Renders game snapshots in a separate process, so a slow frame never stalls the simulation"""
+import multiprocessing
+import os
+import queue
+import time
+from game.world_snapshot import world_snapshot
+
+
+class render_pipeline:
+    """Hands snapshots to a render worker process through a small queue.
+
+    If the worker falls behind, the oldest queued frames are dropped instead of blocking the simulation,
+    unless the pipeline was made lossless, then `publish` waits for room instead and a slow worker slows the simulation.
+    The worker either shows the frames in a window or writes them out as a numbered PNG sequence
+    (e.g. for `ffmpeg -i frame_%06d.png match.mp4`).
+    """
+    def __init__(self, # pylint: disable=too-many-arguments
+                 screen_size:tuple[int,int],
+                 num_players:int,
+                 *,
+                 output_directory:str | None = None,
+                 max_queued_frames:int = 4,
+                 max_fps:float = 60,
+                 view_whole_world:bool = False,
+                 padding_percent:float = 20,
+                 lossless:bool = False):
+        """Render pipeline, call `start` before publishing
+
+        Args:
+            screen_size (tuple[int,int]): size of the rendered frames (width, height)
+            num_players (int): number of players in the game, for colours
+            output_directory (str | None, optional): write frames here as PNGs instead of showing a window. Defaults to None.
+            max_queued_frames (int, optional): frames allowed to wait for the worker before old ones get dropped. Defaults to 4.
+            max_fps (float, optional): `frame_due` rate limit, 0 for no limit. Defaults to 60.
+            view_whole_world (bool, optional): see `game_viewer.find_scale_offset`. Defaults to False.
+            padding_percent (float, optional): see `game_viewer.find_scale_offset`. Defaults to 20.
+            lossless (bool, optional): never drop frames, `publish` blocks while the queue is full. Defaults to False.
+        """
+        # spawn rather than fork, the worker gets a clean pygame/SDL state
+        context = multiprocessing.get_context("spawn")
+        self._queue = context.Queue(maxsize=max_queued_frames)
+        self._stopped = context.Event()
+        self._process = context.Process(
+            target=_render_worker,
+            args=(self._queue, self._stopped),
+            kwargs={
+                "screen_size": screen_size,
+                "num_players": num_players,
+                "output_directory": output_directory,
+                "view_whole_world": view_whole_world,
+                "padding_percent": padding_percent,
+            },
+            daemon=True,
+        )
+        self._min_frame_interval = 1 / max_fps if max_fps > 0 else 0
+        self._last_publish = -float("inf")
+        self.lossless = lossless
+        '''whether `publish` waits for the worker instead of dropping frames'''
+        self.dropped_frames = 0
+        '''how many frames were thrown away because the worker was behind'''
+
+    def start(self):
+        """start the render worker process"""
+        self._process.start()
+
+    @property
+    def running(self) -> bool:
+        """False once the worker has stopped, e.g. because the window was closed"""
+        return self._process.is_alive() and not self._stopped.is_set()
+
+    def frame_due(self) -> bool:
+        """whether enough time has passed since the last published frame,
+        check this before taking a snapshot to avoid snapshotting every tick
+
+        Returns:
+            bool: True if a frame should be published now
+        """
+        return time.perf_counter() - self._last_publish >= self._min_frame_interval
+
+    def publish(self, snapshot:world_snapshot):
+        """queue a snapshot for rendering, only blocks when the pipeline is lossless and the worker is behind
+
+        Args:
+            snapshot (world_snapshot): the snapshot to render
+        """
+        self._last_publish = time.perf_counter()
+        if self.lossless:
+            while self.running:
+                try:
+                    self._queue.put(snapshot, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass # keep waiting, unless the worker stopped meanwhile
+            self.dropped_frames += 1
+            return
+        while True:
+            try:
+                self._queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._queue.get_nowait() # drop the oldest frame to make room
+                self.dropped_frames += 1
+            except queue.Empty:
+                pass # the worker just took one, try again
+
+    def close(self, timeout:float = 10):
+        """let the worker finish the queued frames, then stop it
+
+        Args:
+            timeout (float, optional): seconds to wait for the worker before killing it. Defaults to 10.
+        """
+        if self._process.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._queue.close()
+
+
+def _render_worker(frames:multiprocessing.Queue, # pylint: disable=too-many-arguments
+                   stopped,
+                   *,
+                   screen_size:tuple[int,int],
+                   num_players:int,
+                   output_directory:str | None,
+                   view_whole_world:bool,
+                   padding_percent:float):
+    """body of the render worker process, renders snapshots until it gets None"""
+    if output_directory is not None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window needed
+        os.makedirs(output_directory, exist_ok=True)
+    # imported here so only the worker pays for pygame's startup
+    import pygame # pylint: disable=import-outside-toplevel
+    from graphics_display.game_viewer import game_viewer # pylint: disable=import-outside-toplevel
+
+    pygame.init() # pylint: disable=no-member
+    display = pygame.display.set_mode(screen_size) if output_directory is None else None
+    viewer = game_viewer(None, screen_size, num_players=num_players)
+    frame_number = 0
+    try:
+        while not stopped.is_set():
+            if display is not None:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT: # pylint: disable=no-member
+                        return
+            try:
+                snapshot = frames.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if snapshot is None:
+                return
+            viewer.find_scale_offset(view_whole_world=view_whole_world, padding_percent=padding_percent, snapshot=snapshot)
+            viewer.render_snapshot(snapshot)
+            if display is None:
+                pygame.image.save(viewer.screen, os.path.join(output_directory, f"frame_{frame_number:06d}.png"))
+            else:
+                display.blit(viewer.screen, (0, 0))
+                pygame.display.flip()
+            frame_number += 1
+    finally:
+        stopped.set()
+        pygame.quit() # pylint: disable=no-member
@@ -1,12 +1,20 @@
 '''main runner for the game and all training'''
-import sys
-import pygame
+import argparse
 from game import config_classes
 from game.gamerunner import game
-from graphics_display.game_viewer import game_viewer
+from graphics_display.render_pipeline import render_pipeline
 
 if __name__ == "__main__":
-    screen = pygame.display.set_mode((800, 600))
+    parser = argparse.ArgumentParser(description="run a match and show it in a window, or record it")
+    parser.add_argument("--record", metavar="DIRECTORY", default=None,
+                        help="write every frame to DIRECTORY as a PNG instead of opening a window")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help="stop after this many updates, required with --record, by default runs until the window is closed")
+    parser.add_argument("--lossless", action="store_true",
+                        help="never drop frames, the simulation waits for the renderer instead")
+    args = parser.parse_args()
+    if args.record is not None and args.ticks is None:
+        parser.error("--record needs --ticks, there is no window to close")
     game_cfg = config_classes.game_config(
         num_players=2,
         player_configs=[
@@ -38,19 +46,24 @@ if __name__ == "__main__":
         asteroid_size_stddev=50,
     )
     game_instance = game(game_cfg)
-    viewer = game_viewer(game_instance, screen.get_size())
-    while True:
-        # handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-
+    # rendering happens in its own process, frames are dropped when it falls behind, unless --lossless
+    pipeline = render_pipeline(
+        (800, 600),
+        num_players=game_cfg.num_players,
+        output_directory=args.record,
+        view_whole_world=True,
+        padding_percent=20,
+        lossless=args.lossless,
+    )
+    pipeline.start()
+    tick = 0
+    while pipeline.running and (args.ticks is None or tick < args.ticks):
         # update game
         game_instance.update(time_delta=0.001)
+        tick += 1
 
-        # draw game
-        screen.fill((0, 0, 0))
-        viewer.find_scale_offset(padding_percent=20, view_whole_world=True)
-        viewer.render_to_self()
-        screen.blit(viewer.screen,(0,0))
-        pygame.display.flip()
+        # hand a frame to the renderer
+        if pipeline.frame_due():
+            pipeline.publish(game_instance.snapshot())
+    pipeline.close()
+    game_instance.close()
@@ -0,0 +1,344 @@
+"""Collision detection and impulse based collision response for whole arrays of bodies at once
+
+Contacts are found with a sweep and prune broadphase followed by exact circle/rect tests,
+then solved with a fixed number of Jacobi iterations. Every body's share of an impulse is split
+between all of its contacts (mass splitting), so piles of bodies settle instead of exploding.
+There is no per-pair python loop anywhere, and pairs are always processed sorted by (a, b),
+so the same bodies in the same rows always give bit-for-bit the same result.
+"""
+import numpy as np
+
+CONTACT_DTYPE = np.dtype([
+    ("a", "<i8"), # row of the first body, always < b
+    ("b", "<i8"), # row of the second body
+    ("normal", "<f8", (2,)), # unit vector from a towards b
+    ("depth", "<f8"), # penetration depth before positional correction, meters
+    ("closing_speed", "<f8"), # speed the bodies approached each other at along the normal, before any impulse, m/s
+    ("impulse", "<f8"), # total normal impulse applied, newton seconds
+])
+'''one pair of touching bodies, returned by `contact_solver.solve`'''
+
+
+def find_pairs(positions:np.ndarray, radius:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """broadphase, every pair of bodies whose bounding circles overlap
+
+    Args:
+        positions (np.ndarray): (n, 2) positions
+        radius (np.ndarray): (n,) bounding radii
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: rows a and b of every pair, a < b, sorted by (a, b)
+    """
+    # sweep and prune along x: after sorting by the left edge, every body can only
+    # overlap the bodies that start before its right edge does
+    left = positions[:, 0] - radius
+    order = np.argsort(left, kind="stable")
+    sorted_left = left[order]
+    ends = np.searchsorted(sorted_left, (positions[:, 0] + radius)[order], side="right")
+    candidates = np.maximum(ends - np.arange(len(order)) - 1, 0)
+    first = np.repeat(np.arange(len(order)), candidates)
+    # for each sorted body i, its candidates are sorted bodies i+1 ... ends[i]-1
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(candidates) - candidates, candidates)
+    a, b = order[first], order[second]
+
+    difference = positions[b] - positions[a]
+    reach = radius[a] + radius[b]
+    touching = np.einsum("ij,ij->i", difference, difference) < reach * reach
+    a, b = np.minimum(a, b)[touching], np.maximum(a, b)[touching]
+    canonical = np.lexsort((b, a))
+    return a[canonical], b[canonical]
+
+def contact_normals(positions:np.ndarray, # pylint: disable=too-many-locals
+                    rotation:np.ndarray,
+                    radius:np.ndarray,
+                    extent:np.ndarray,
+                    pairs:tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """narrowphase, exact normal and penetration depth of every candidate pair
+
+    Bodies with a zero extent are circles of `radius`, the others are rects of `extent` rotated by `rotation`.
+
+    Args:
+        positions (np.ndarray): (n, 2) positions
+        rotation (np.ndarray): (n,) rotations in radians
+        radius (np.ndarray): (n,) circle radii
+        extent (np.ndarray): (n, 2) (width, height) of rects, (0, 0) for circles
+        pairs (tuple[np.ndarray, np.ndarray]): rows a and b of every candidate pair, see `find_pairs`
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (pairs, 2) unit normals from a to b, and (pairs,) depths, <= 0 if not touching
+    """
+    a, b = pairs
+    normal = np.zeros((len(a), 2))
+    depth = np.full(len(a), -np.inf)
+    a_rect = extent[a, 0] > 0
+    b_rect = extent[b, 0] > 0
+
+    circles = ~a_rect & ~b_rect
+    if np.any(circles):
+        ca, cb = a[circles], b[circles]
+        difference = positions[cb] - positions[ca]
+        distance = np.hypot(difference[:, 0], difference[:, 1])
+        # bodies exactly on top of each other get pushed apart along x
+        normal[circles] = np.where(distance[:, None] > 0, difference / np.maximum(distance, 1e-12)[:, None], (1.0, 0.0))
+        depth[circles] = radius[ca] + radius[cb] - distance
+
+    for circle_first in (True, False):
+        mixed = (~a_rect & b_rect) if circle_first else (a_rect & ~b_rect)
+        if not np.any(mixed):
+            continue
+        circle, rect = (a[mixed], b[mixed]) if circle_first else (b[mixed], a[mixed])
+        rect_to_circle, mixed_depth = _circle_rect(positions[circle], radius[circle],
+                                                   positions[rect], rotation[rect], extent[rect] / 2)
+        normal[mixed] = -rect_to_circle if circle_first else rect_to_circle
+        depth[mixed] = mixed_depth
+
+    rects = a_rect & b_rect
+    if np.any(rects):
+        normal[rects], depth[rects] = _rect_rect((positions[a[rects]], rotation[a[rects]], extent[a[rects]] / 2),
+                                                 (positions[b[rects]], rotation[b[rects]], extent[b[rects]] / 2))
+    return normal, depth
+
+def _circle_rect(circle_position:np.ndarray, circle_radius:np.ndarray, # pylint: disable=too-many-locals
+                 rect_position:np.ndarray, rect_rotation:np.ndarray, half_extent:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """normals from the rect to the circle, and depths"""
+    cos, sin = np.cos(rect_rotation), np.sin(rect_rotation)
+    difference = circle_position - rect_position
+    # circle centre in the rect's own frame
+    local = np.stack((cos * difference[:, 0] + sin * difference[:, 1],
+                      cos * difference[:, 1] - sin * difference[:, 0]), axis=1)
+    outside_by = local - np.clip(local, -half_extent, half_extent)
+    distance = np.hypot(outside_by[:, 0], outside_by[:, 1])
+    inside = distance == 0
+
+    # centre outside the rect: push away from the closest point on the rect
+    local_normal = outside_by / np.where(inside, 1.0, distance)[:, None]
+    depth = circle_radius - distance
+    # centre inside the rect: push out through the nearest edge
+    penetration = half_extent - np.abs(local)
+    along_x = penetration[:, 0] < penetration[:, 1]
+    sign = np.where(local >= 0, 1.0, -1.0)
+    local_normal[inside] = np.where(along_x[:, None], (1.0, 0.0), (0.0, 1.0))[inside] * sign[inside]
+    depth[inside] = circle_radius[inside] + np.min(penetration[inside], axis=1)
+
+    normal = np.stack((cos * local_normal[:, 0] - sin * local_normal[:, 1],
+                       sin * local_normal[:, 0] + cos * local_normal[:, 1]), axis=1)
+    return normal, depth
+
+def _rect_rect(rects_a:tuple[np.ndarray, np.ndarray, np.ndarray], # pylint: disable=too-many-locals
+               rects_b:tuple[np.ndarray, np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """separating axis test between (position, rotation, half extent) rects, the normal is the axis with the least overlap"""
+    position_a, rotation_a, half_a = rects_a
+    position_b, rotation_b, half_b = rects_b
+    def axes(rotation:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cos, sin = np.cos(rotation), np.sin(rotation)
+        return np.stack((cos, sin), axis=1), np.stack((-sin, cos), axis=1)
+    a_x, a_y = axes(rotation_a)
+    b_x, b_y = axes(rotation_b)
+    difference = position_b - position_a
+    candidates = np.stack((a_x, a_y, b_x, b_y), axis=1) # (pairs, 4, 2)
+
+    def projected_half(half:np.ndarray, x_axis:np.ndarray, y_axis:np.ndarray) -> np.ndarray:
+        return half[:, 0, None] * np.abs(np.einsum("pkj,pj->pk", candidates, x_axis)) \
+            + half[:, 1, None] * np.abs(np.einsum("pkj,pj->pk", candidates, y_axis))
+    separation = np.einsum("pkj,pj->pk", candidates, difference)
+    overlap = projected_half(half_a, a_x, a_y) + projected_half(half_b, b_x, b_y) - np.abs(separation)
+    best = np.argmin(overlap, axis=1)
+    pairs = np.arange(len(best))
+    sign = np.where(separation[pairs, best] >= 0, 1.0, -1.0)
+    return candidates[pairs, best] * sign[:, None], overlap[pairs, best]
+
+
+def detect_contacts(positions:np.ndarray, # pylint: disable=too-many-arguments
+                    masses:np.ndarray,
+                    rotation:np.ndarray,
+                    radius:np.ndarray,
+                    extent:np.ndarray,
+                    *,
+                    pairs:tuple[np.ndarray, np.ndarray] | None = None) -> np.ndarray:
+    """broadphase and narrowphase, every pair of touching bodies that can respond to a collision
+
+    Args:
+        positions (np.ndarray): (n, 2) positions
+        masses (np.ndarray): (n,) masses, pairs of two immovable (0 mass) bodies are left out
+        rotation (np.ndarray): (n,) rotations
+        radius (np.ndarray): (n,) bounding radii, exact for circles
+        extent (np.ndarray): (n, 2) (width, height) of rects, (0, 0) for circles
+        pairs (tuple[np.ndarray, np.ndarray] | None, optional): candidate pairs to test, None for `find_pairs`. Defaults to None.
+
+    Returns:
+        np.ndarray: CONTACT_DTYPE array with 0 impulses, in the same order as the pairs
+    """
+    a, b = find_pairs(positions, radius) if pairs is None else pairs
+    normal, depth = contact_normals(positions, rotation, radius, extent, (a, b))
+    touching = (depth > 0) & ((masses[a] > 0) | (masses[b] > 0)) # two immovable bodies can't respond
+    contacts = np.empty(np.count_nonzero(touching), dtype=CONTACT_DTYPE)
+    contacts["a"], contacts["b"] = a[touching], b[touching]
+    contacts["normal"], contacts["depth"] = normal[touching], depth[touching]
+    contacts["closing_speed"] = 0
+    contacts["impulse"] = 0
+    return contacts
+
+
+class contact_solver:
+    """Makes overlapping bodies bounce off each other, exchanging momentum, and pushes them apart
+    """
+    def __init__(self, # pylint: disable=too-many-arguments
+                 iterations:int = 8,
+                 *,
+                 restitution:float = 0.3,
+                 friction:float = 0.2,
+                 bounce_threshold:float = 0.5,
+                 slop:float = 0.01,
+                 correction:float = 0.4):
+        """Contact solver
+
+        Args:
+            iterations (int, optional): velocity solver iterations per tick. Defaults to 8.
+            restitution (float, optional): bounciness, 0 for none, 1 for perfectly elastic. Defaults to 0.3.
+            friction (float, optional): coulomb friction coefficient. Defaults to 0.2.
+            bounce_threshold (float, optional): closing speeds below this (m/s) don't bounce, keeps resting contacts still. Defaults to 0.5.
+            slop (float, optional): penetration (m) left alone by positional correction, avoids jitter. Defaults to 0.01.
+            correction (float, optional): fraction of the remaining penetration removed per tick. Defaults to 0.4.
+        """
+        self.iterations = iterations
+        self.restitution = restitution
+        self.friction = friction
+        self.bounce_threshold = bounce_threshold
+        self.slop = slop
+        self.correction = correction
+        self._cache:tuple[int, np.ndarray, np.ndarray, np.ndarray] | None = None
+        # ^ (body count, keys, normal impulses, tangent impulses) of last tick's contacts, for warm starting
+
+    def solve(self, # pylint: disable=too-many-arguments
+              positions:np.ndarray,
+              velocities:np.ndarray,
+              *,
+              masses:np.ndarray,
+              rotation:np.ndarray,
+              radius:np.ndarray,
+              extent:np.ndarray) -> np.ndarray:
+        """find every contact and resolve it, `positions` and `velocities` are updated in place
+
+        Bodies with a mass of 0 are immovable. There is no angular velocity, so impulses only change linear velocity.
+        Call once per tick, impulses are carried over to the next call for contacts between the same rows.
+
+        Args:
+            positions (np.ndarray): (n, 2) positions, e.g. a body_state column
+            velocities (np.ndarray): (n, 2) velocities
+            masses (np.ndarray): (n,) masses
+            rotation (np.ndarray): (n,) rotations
+            radius (np.ndarray): (n,) bounding radii, exact for circles
+            extent (np.ndarray): (n, 2) (width, height) of rects, (0, 0) for circles
+
+        Returns:
+            np.ndarray: CONTACT_DTYPE array of the contacts, sorted by (a, b)
+        """
+        contacts = detect_contacts(positions, masses, rotation, radius, extent)
+        if len(contacts) == 0:
+            self.reset()
+            return contacts
+        keys = contacts["a"] * len(masses) + contacts["b"]
+        tangent_impulse = self.resolve(positions, velocities, masses, contacts, self.warm_start(keys, len(masses)))
+        self.remember(keys, len(masses), contacts["impulse"], tangent_impulse)
+        return contacts
+
+    def resolve(self, # pylint: disable=too-many-arguments,too-many-locals
+                positions:np.ndarray,
+                velocities:np.ndarray,
+                masses:np.ndarray,
+                contacts:np.ndarray,
+                warm_start:tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """apply the impulses and positional correction for already detected contacts, see `solve`
+
+        Contacts that share no bodies don't affect each other, so resolving any set of whole islands
+        (groups of contacts connected through shared bodies) on their own gives exactly the same result.
+
+        Args:
+            positions (np.ndarray): (n, 2) positions, updated in place
+            velocities (np.ndarray): (n, 2) velocities, updated in place
+            masses (np.ndarray): (n,) masses
+            contacts (np.ndarray): CONTACT_DTYPE contacts sorted by (a, b), their closing speeds and impulses are filled in
+            warm_start (tuple[np.ndarray, np.ndarray]): normal and tangent impulse every contact starts from, see `warm_start`
+
+        Returns:
+            np.ndarray: the friction impulse of every contact, for `remember`
+        """
+        a, b, normal, depth = contacts["a"], contacts["b"], contacts["normal"], contacts["depth"]
+        inverse_mass = np.where(masses > 0, 1 / np.where(masses > 0, masses, 1), 0)
+        # mass splitting: a body in k contacts acts as k bodies of 1/k its mass, one per contact,
+        # which keeps the simultaneous (jacobi) updates from over-correcting bodies in a pile
+        contact_count = np.bincount(np.concatenate((a, b)), minlength=len(masses))
+        effective_inverse = 1 / (inverse_mass[a] * contact_count[a] + inverse_mass[b] * contact_count[b])
+        tangent = np.stack((-normal[:, 1], normal[:, 0]), axis=1)
+
+        closing = np.einsum("ij,ij->i", velocities[b] - velocities[a], normal)
+        contacts["closing_speed"] = np.maximum(-closing, 0)
+        target = np.where(closing < -self.bounce_threshold, -self.restitution * closing, 0.0)
+        # warm start: contacts that already existed last tick start from last tick's impulses,
+        # so resting contacts (stacks) hold from the first iteration instead of slowly converging every tick
+        normal_impulse, tangent_impulse = warm_start
+        _apply(velocities, a, b, normal * normal_impulse[:, None] + tangent * tangent_impulse[:, None], inverse_mass)
+        for _ in range(self.iterations):
+            relative = velocities[b] - velocities[a]
+            previous = normal_impulse
+            normal_impulse = np.maximum(
+                normal_impulse + (target - np.einsum("ij,ij->i", relative, normal)) * effective_inverse, 0)
+            limit = self.friction * normal_impulse
+            previous_tangent = tangent_impulse
+            tangent_impulse = np.clip(
+                tangent_impulse - np.einsum("ij,ij->i", relative, tangent) * effective_inverse, -limit, limit)
+            impulse = normal * (normal_impulse - previous)[:, None] + tangent * (tangent_impulse - previous_tangent)[:, None]
+            _apply(velocities, a, b, impulse, inverse_mass)
+        contacts["impulse"] = normal_impulse
+
+        # push overlapping bodies apart directly, without adding any velocity,
+        # iterated like the velocities, with the depth updated along the (fixed) normals as bodies move
+        displacement = np.zeros((len(masses), 2))
+        for _ in range(self.iterations):
+            remaining = depth - np.einsum("ij,ij->i", displacement[b] - displacement[a], normal)
+            push = np.maximum(remaining - self.slop, 0) * (self.correction * effective_inverse)
+            _apply(displacement, a, b, normal * push[:, None], inverse_mass)
+        positions += displacement
+        return tangent_impulse
+
+    def warm_start(self, keys:np.ndarray, count:int) -> tuple[np.ndarray, np.ndarray]:
+        """last tick's normal and tangent impulses of every contact that existed then, 0 for new contacts
+
+        Args:
+            keys (np.ndarray): a * count + b of every contact, sorted
+            count (int): number of bodies
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: normal and tangent impulses
+        """
+        normal_impulse = np.zeros(len(keys))
+        tangent_impulse = np.zeros(len(keys))
+        if self._cache is None or self._cache[0] != count:
+            return normal_impulse, tangent_impulse
+        _, previous_keys, previous_normal, previous_tangent = self._cache
+        # both key arrays are sorted, because contacts are sorted by (a, b)
+        index = np.minimum(np.searchsorted(previous_keys, keys), max(len(previous_keys) - 1, 0))
+        found = (previous_keys[index] == keys) if len(previous_keys) > 0 else np.zeros(len(keys), dtype=bool)
+        normal_impulse[found] = previous_normal[index[found]]
+        tangent_impulse[found] = previous_tangent[index[found]]
+        return normal_impulse, tangent_impulse
+
+    def remember(self, keys:np.ndarray, count:int, normal_impulse:np.ndarray, tangent_impulse:np.ndarray):
+        """keep this tick's impulses to warm start the next tick with
+
+        Args:
+            keys (np.ndarray): a * count + b of every contact, sorted
+            count (int): number of bodies
+            normal_impulse (np.ndarray): normal impulse of every contact
+            tangent_impulse (np.ndarray): friction impulse of every contact
+        """
+        self._cache = (count, keys, normal_impulse, tangent_impulse)
+
+    def reset(self):
+        """forget last tick's contacts, call this whenever bodies change rows (e.g. after a despawn)"""
+        self._cache = None
+
+def _apply(values:np.ndarray, a:np.ndarray, b:np.ndarray, amounts:np.ndarray, inverse_mass:np.ndarray):
+    """add amounts * inverse mass to b and subtract it from a, summed in pair order"""
+    np.add.at(values, b, amounts * inverse_mass[b, None])
+    np.subtract.at(values, a, amounts * inverse_mass[a, None])
@@ -0,0 +1,147 @@
+"""Closed-form two-body motion around a central point mass, vectorized over many bodies
+
+Uses the universal variable formulation of Kepler's problem, so circular, elliptic,
+parabolic and hyperbolic trajectories all go through the same code path.
+Every body converges independently (converged bodies are frozen), so a body's result never depends
+on which other bodies were propagated in the same batch.
+"""
+import numpy as np
+
+GRAVITATIONAL_CONSTANT = 6.674e-11
+'''in m^3 kg^-1 s^-2'''
+
+_SERIES_LIMIT = 1e-6 # below this |z|, the Stumpff functions are evaluated as a series
+
+
+def gravity_acceleration(positions:np.ndarray, gravitational_parameter:float) -> np.ndarray:
+    """acceleration towards a point mass at the origin
+
+    Args:
+        positions (np.ndarray): (n, 2) positions relative to the central mass, meters
+        gravitational_parameter (float): G * M of the central mass, m^3/s^2
+
+    Returns:
+        np.ndarray: (n, 2) accelerations in m/s^2
+    """
+    distance_sq = np.einsum("ij,ij->i", positions, positions)
+    # guard against a body sitting exactly on the centre
+    inverse_cube = np.where(distance_sq > 0, distance_sq, np.inf) ** -1.5
+    return positions * (-gravitational_parameter * inverse_cube)[:, None]
+
+def stumpff(z:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Stumpff functions C(z) and S(z)
+
+    Args:
+        z (np.ndarray): alpha * chi^2 per body
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: C(z), S(z)
+    """
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+    elliptic = z > _SERIES_LIMIT
+    hyperbolic = z < -_SERIES_LIMIT
+    near_zero = ~(elliptic | hyperbolic)
+
+    sqrt_z = np.sqrt(z[elliptic])
+    c[elliptic] = (1 - np.cos(sqrt_z)) / z[elliptic]
+    s[elliptic] = (sqrt_z - np.sin(sqrt_z)) / sqrt_z ** 3
+
+    with np.errstate(over="ignore"):
+        sqrt_neg_z = np.sqrt(-z[hyperbolic])
+        c[hyperbolic] = (np.cosh(sqrt_neg_z) - 1) / -z[hyperbolic]
+        s[hyperbolic] = (np.sinh(sqrt_neg_z) - sqrt_neg_z) / sqrt_neg_z ** 3
+
+    z_small = z[near_zero]
+    c[near_zero] = 1 / 2 - z_small / 24 + z_small ** 2 / 720
+    s[near_zero] = 1 / 6 - z_small / 120 + z_small ** 2 / 5040
+    return c, s
+
+def propagate_kepler(positions:np.ndarray, # pylint: disable=too-many-locals,too-many-arguments
+                     velocities:np.ndarray,
+                     gravitational_parameter:float,
+                     time_delta:float,
+                     *,
+                     max_iterations:int = 50,
+                     tolerance:float = 1e-12) -> tuple[np.ndarray, np.ndarray]:
+    """advance coasting bodies along their two-body trajectories, exactly (up to solver tolerance)
+
+    Args:
+        positions (np.ndarray): (n, 2) positions relative to the central mass, meters
+        velocities (np.ndarray): (n, 2) velocities, m/s
+        gravitational_parameter (float): G * M of the central mass, m^3/s^2
+        time_delta (float): how far ahead to propagate, seconds, can be much longer than an orbit
+        max_iterations (int, optional): solver iteration cap. Defaults to 50.
+        tolerance (float, optional): relative convergence tolerance on the universal anomaly. Defaults to 1e-12.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: new (n, 2) positions and velocities, as float64
+    """
+    r0 = np.asarray(positions, dtype=np.float64)
+    v0 = np.asarray(velocities, dtype=np.float64)
+    mu = gravitational_parameter
+    sqrt_mu = np.sqrt(mu)
+
+    r0_norm = np.sqrt(np.einsum("ij,ij->i", r0, r0))
+    r0_dot_v0 = np.einsum("ij,ij->i", r0, v0)
+    v0_sq = np.einsum("ij,ij->i", v0, v0)
+    alpha = 2 / r0_norm - v0_sq / mu # reciprocal of the semi-major axis, <0 for hyperbolic orbits
+
+    # closed orbits repeat every period, only the remainder needs solving for
+    elliptic = alpha > _SERIES_LIMIT / np.maximum(r0_norm, 1)
+    dt = np.full(len(r0), float(time_delta))
+    period = np.full(len(r0), np.inf)
+    period[elliptic] = 2 * np.pi / (np.sqrt(mu) * alpha[elliptic] ** 1.5)
+    dt[elliptic] = np.fmod(dt[elliptic], period[elliptic])
+
+    # initial guesses, for short steps the first order guess is already close,
+    # longer steps use the guesses from Vallado "Fundamentals of Astrodynamics and Applications", algorithm 8
+    chi = sqrt_mu * dt / r0_norm
+    long_step = np.abs(dt) * np.sqrt(v0_sq) > r0_norm
+    elliptic_long = elliptic & long_step
+    chi[elliptic_long] = sqrt_mu * dt[elliptic_long] * alpha[elliptic_long]
+    hyperbolic = long_step & (alpha < -_SERIES_LIMIT / np.maximum(r0_norm, 1))
+    if np.any(hyperbolic):
+        semi_major = 1 / alpha[hyperbolic]
+        direction = np.sign(dt[hyperbolic])
+        log_argument = (-2 * mu * alpha[hyperbolic] * dt[hyperbolic]) / (
+            r0_dot_v0[hyperbolic] + direction * np.sqrt(-mu * semi_major) * (1 - r0_norm[hyperbolic] * alpha[hyperbolic]))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            guess = direction * np.sqrt(-semi_major) * np.log(log_argument)
+        chi[hyperbolic] = np.where(np.isfinite(guess), guess, chi[hyperbolic])
+
+    # Laguerre-Conway iterations, robust even close to periapsis of very eccentric orbits where Newton overshoots
+    # each body stops as soon as it has converged
+    radial = r0_dot_v0 / sqrt_mu
+    one_minus_alpha_r0 = 1 - alpha * r0_norm
+    active = np.flatnonzero(dt != 0)
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+        chi_a = chi[active]
+        chi_sq = chi_a * chi_a
+        z = alpha[active] * chi_sq
+        c, s = stumpff(z)
+        # residual of sqrt(mu) * t(chi) = sqrt(mu) * dt, and its first two derivatives
+        residual = (radial[active] * chi_sq * c
+                    + one_minus_alpha_r0[active] * chi_sq * chi_a * s
+                    + r0_norm[active] * chi_a) - sqrt_mu * dt[active]
+        first = (radial[active] * chi_a * (1 - z * s)
+                 + one_minus_alpha_r0[active] * chi_sq * c
+                 + r0_norm[active]) # this is r(chi), always positive
+        second = radial[active] * (1 - z * c) + one_minus_alpha_r0[active] * chi_a * (1 - z * s)
+        step = -5 * residual / (first + np.sqrt(np.abs(16 * first * first - 20 * residual * second)))
+        chi[active] = chi_a + step
+        active = active[np.abs(step) > tolerance * np.maximum(np.abs(chi_a), 1)]
+
+    # Lagrange coefficients
+    chi_sq = chi * chi
+    c, s = stumpff(alpha * chi_sq)
+    f = 1 - chi_sq / r0_norm * c
+    g = dt - chi_sq * chi / sqrt_mu * s
+    new_positions = f[:, None] * r0 + g[:, None] * v0
+    r_norm = np.sqrt(np.einsum("ij,ij->i", new_positions, new_positions))
+    f_dot = sqrt_mu / (r_norm * r0_norm) * (alpha * chi_sq * chi * s - chi)
+    g_dot = 1 - chi_sq / r_norm * c
+    new_velocities = f_dot[:, None] * r0 + g_dot[:, None] * v0
+    return new_positions, new_velocities
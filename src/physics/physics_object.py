@@ -1,5 +1,6 @@
 """Class holding physics objects and their properties"""
 from __future__ import annotations
+from typing import Any, Protocol
 from math_lib.vector2 import vector2
 
 class collider: # pylint: disable=too-few-public-methods
@@ -137,7 +138,56 @@ class rect_collider(collider):
         raise TypeError("other must be a collider, likely that a child class did not override check_collision")
 
 
-class physics_object:
+class body_storage(Protocol):
+    """Somewhere other than the object itself that a physics object's state can live,
+    e.g. a row in a table of numpy arrays, so whole worlds can be simulated in bulk
+    """
+    def get(self, row:int, name:str) -> Any:
+        """read `name` ("position", "velocity", "rotation" or "mass") of a row, vectors as (x, y) tuples"""
+    def set(self, row:int, name:str, value:Any):
+        """write `name` of a row, vectors as (x, y) tuples"""
+
+_STORED_STATE = ("position", "velocity", "rotation", "mass")
+
+class stored_vector2(vector2):
+    """A vector2 view of the position or velocity of a physics object,
+    reads and writes go through to wherever the object's state lives (see `physics_object.attach_storage`),
+    so in-place edits like `obj.position.x += 1` or `obj.velocity.rotate_rad(a)` stick.
+    `copy()` (and any arithmetic) gives a plain, detached vector2.
+    """
+    def __init__(self, owner:physics_object, name:str): # pylint: disable=super-init-not-called
+        # no super().__init__, x and y are properties here
+        self._owner = owner
+        self._name = name
+
+    @property
+    def x(self) -> float:
+        """x component, read from the owner's state"""
+        return self._owner.read_vector(self._name)[0]
+
+    @x.setter
+    def x(self, value:float):
+        self._owner.write_vector(self._name, (value, self.y))
+
+    @property
+    def y(self) -> float:
+        """y component, read from the owner's state"""
+        return self._owner.read_vector(self._name)[1]
+
+    @y.setter
+    def y(self, value:float):
+        self._owner.write_vector(self._name, (self.x, value))
+
+    def to_tuple(self) -> tuple[float, float]:
+        """return a tuple representation of this vector, read in one go
+
+        Returns:
+            tuple[float, float]: tuple containing the x and y values of this vector
+        """
+        return self._owner.read_vector(self._name)
+
+
+class physics_object: # pylint: disable=too-many-instance-attributes
     """An object that has physical properties and can be simulated
     """
     def __init__(self, mass:float, position: vector2, velocity: vector2, phys_collider: collider):
@@ -149,11 +199,126 @@ class physics_object:
             velocity (vector2): velocity in meters per second
             collision_mode (collision_mode): collision mode for this object
         """
-        self.mass = mass
-        self.position = position
-        self.velocity = velocity
-        self.rotation = 0.0 # radians
+        self._storage:body_storage | None = None
+        self._storage_row = -1
+        self._mass = mass
+        self._position = position
+        self._velocity = velocity
+        self._rotation = 0.0 # radians
         self.collider = phys_collider
+        self.handle:tuple[int, int] | None = None
+        '''handle in the game world this object is spawned in, managed by the game world'''
+
+    # while attached to a storage, the state lives there, position and velocity are then `stored_vector2` views of it
+    @property
+    def mass(self) -> float:
+        """mass in kg"""
+        return self._mass if self._storage is None else self._storage.get(self._storage_row, "mass")
+
+    @mass.setter
+    def mass(self, value:float):
+        if self._storage is None:
+            self._mass = value
+        else:
+            self._storage.set(self._storage_row, "mass", value)
+
+    @property
+    def position(self) -> vector2:
+        """position in meters from the origin"""
+        if self._storage is None:
+            return self._position
+        return stored_vector2(self, "position")
+
+    @position.setter
+    def position(self, value:vector2):
+        if self._storage is None:
+            self._position = value
+        else:
+            self._storage.set(self._storage_row, "position", value.to_tuple())
+
+    @property
+    def velocity(self) -> vector2:
+        """velocity in meters per second"""
+        if self._storage is None:
+            return self._velocity
+        return stored_vector2(self, "velocity")
+
+    @velocity.setter
+    def velocity(self, value:vector2):
+        if self._storage is None:
+            self._velocity = value
+        else:
+            self._storage.set(self._storage_row, "velocity", value.to_tuple())
+
+    @property
+    def rotation(self) -> float:
+        """rotation in radians"""
+        return self._rotation if self._storage is None else self._storage.get(self._storage_row, "rotation")
+
+    @rotation.setter
+    def rotation(self, value:float):
+        if self._storage is None:
+            self._rotation = value
+        else:
+            self._storage.set(self._storage_row, "rotation", value)
+
+    def read_vector(self, name:str) -> tuple[float, float]:
+        """current value of a vector ("position" or "velocity"), wherever it lives, see `stored_vector2`
+
+        Args:
+            name (str): which vector
+
+        Returns:
+            tuple[float, float]: its (x, y)
+        """
+        if self._storage is None:
+            return getattr(self, "_" + name).to_tuple()
+        return self._storage.get(self._storage_row, name)
+
+    def write_vector(self, name:str, value:tuple[float, float]):
+        """overwrite a vector ("position" or "velocity"), wherever it lives, see `stored_vector2`
+
+        Args:
+            name (str): which vector
+            value (tuple[float, float]): the new (x, y)
+        """
+        if self._storage is None:
+            vector = getattr(self, "_" + name)
+            vector.x, vector.y = value
+        else:
+            self._storage.set(self._storage_row, name, value)
+
+    def attach_storage(self, storage:body_storage, row:int):
+        """move this object's state into a row of `storage`, from then on that row is the source of truth
+
+        Args:
+            storage (body_storage): where the state should live
+            row (int): row in the storage
+        """
+        for name in _STORED_STATE:
+            value = getattr(self, name)
+            storage.set(row, name, value.to_tuple() if isinstance(value, vector2) else value)
+        self._storage = storage
+        self._storage_row = row
+
+    def move_storage_row(self, row:int):
+        """tell an attached object that its state has moved to another row of the same storage
+
+        Args:
+            row (int): the new row
+        """
+        self._storage_row = row
+
+    def detach_storage(self):
+        """copy the state back out of the storage, the object then holds its own state again"""
+        if self._storage is None:
+            return
+        state = {name: getattr(self, name) for name in _STORED_STATE}
+        state["position"], state["velocity"] = state["position"].copy(), state["velocity"].copy() # not views
+        self._storage = None
+        self._storage_row = -1
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def check_collision(self, other:physics_object) -> bool:
         """Check if this object is colliding with another object
@@ -172,7 +337,7 @@ class physics_object:
         Args:
             time_delta (float, optional): timescale out of 1. Defaults to 1.0.
         """
-        self.position.scaled_add(self.velocity, time_delta)
+        self.position = self.position + self.velocity * time_delta
 
     def apply_force(self, force:vector2):
         """Apply a force to the object in newtons
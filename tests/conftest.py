@@ -0,0 +1,31 @@
+"""the game code imports its packages from src, like src/main.py does"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def make_config():
+    """builds a two player game_config, keyword arguments override any field"""
+    # imported here, after src is on the path
+    from game import config_classes # pylint: disable=import-outside-toplevel
+
+    def make(**overrides):
+        def fleet():
+            return [config_classes.ship_presets.large_ship(), config_classes.ship_presets.small_ship()]
+        fields = {
+            "num_players": 2,
+            "player_configs": [
+                config_classes.player_config(initial_direction=0, initial_velocity=15, budget=0, fleet=fleet()),
+                config_classes.player_config(initial_direction=3.14, initial_velocity=15, budget=0, fleet=fleet()),
+            ],
+            "world_radius": 1e3,
+            "asteroid_amount": 50,
+            "asteroid_size_mean": 10,
+            "asteroid_size_stddev": 50,
+        }
+        fields.update(overrides)
+        return config_classes.game_config(**fields)
+    return make
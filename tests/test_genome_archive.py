@@ -0,0 +1,40 @@
+"""Tests for the memory-mapped genome archive"""
+import os
+from game.config_classes import ship_presets
+from game.config_classes.game_configuration import player_config
+from game.config_classes.genome_archive import genome_archive
+
+
+def _config(direction:float) -> player_config:
+    return player_config(initial_direction=direction, initial_velocity=15, budget=1000,
+                         fleet=[ship_presets.small_ship(), ship_presets.tiny_drone()])
+
+
+def test_round_trip(tmp_path):
+    """appended configs come back equal"""
+    archive = genome_archive(str(tmp_path))
+    first = archive.append(_config(0.5), generation=0)
+    second = archive.append(_config(1.5), generation=1, parents=(first, -1))
+    assert archive.get(first) == _config(0.5)
+    assert archive.get(second) == _config(1.5)
+    assert archive.lineage(second) == [first]
+
+
+def test_append_after_torn_write(tmp_path):
+    """a record torn by a crash mid-append is dropped instead of shifting every later record"""
+    archive = genome_archive(str(tmp_path))
+    archive.append(_config(0.5), generation=0)
+    for name in ("genomes.bin", "ships.bin"):
+        with open(os.path.join(tmp_path, name), "ab") as file:
+            file.write(b"\x01" * 10)
+    assert len(archive) == 1
+    second = archive.append(_config(1.5), generation=0)
+    assert second == 1
+    assert archive.get(0) == _config(0.5)
+    assert archive.get(1) == _config(1.5)
+    # reopening cuts off a torn record too
+    with open(os.path.join(tmp_path, "genomes.bin"), "ab") as file:
+        file.write(b"\x01" * 10)
+    reopened = genome_archive(str(tmp_path))
+    assert reopened.append(_config(2.5), generation=1) == 2
+    assert reopened.get(2) == _config(2.5)
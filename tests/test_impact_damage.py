@@ -0,0 +1,57 @@
+"""Tests for collision damage between ships and other bodies"""
+import numpy as np
+from game import config_classes
+from game.gamerunner import game
+from math_lib.vector2 import vector2
+from physics.physics_object import physics_object, rect_collider
+
+
+def _ship_against_wall(speed:float) -> tuple[game, int]:
+    """a game with a ship at rest (or moving right at `speed`) just touching an immovable wall on its right"""
+    config = config_classes.game_config(
+        num_players=2,
+        player_configs=[
+            config_classes.player_config(initial_direction=0, initial_velocity=0, budget=0,
+                                         fleet=[config_classes.ship_presets.small_ship()]),
+            config_classes.player_config(initial_direction=np.pi, initial_velocity=0, budget=0,
+                                         fleet=[config_classes.ship_presets.small_ship()]),
+        ],
+        world_radius=1e4,
+        asteroid_amount=0,
+        asteroid_size_mean=1,
+        asteroid_size_stddev=0,
+    )
+    instance = game(config)
+    instance.game_world.spawn(physics_object(
+        mass=0, position=vector2(0, 0), velocity=vector2(0, 0), phys_collider=rect_collider(4, 200)))
+    bodies = instance.game_world.body_state
+    ship = instance.game_world.row_of(instance.players[0].ships[0].handle)
+    bodies.column("rotation")[ship] = 0
+    bodies.column("position")[ship] = (-2 - bodies.column("extent")[ship, 0] / 2 + 1e-3, 0)
+    bodies.column("velocity")[ship] = (speed, 0)
+    return instance, ship
+
+
+def test_resting_contact_deals_no_damage():
+    """a ship pushed against a wall for a long time never gets hurt"""
+    instance, ship = _ship_against_wall(0)
+    bodies = instance.game_world.body_state
+    health = instance.ship_status.column("health")[ship]
+    for _ in range(300):
+        bodies.add_force(ship, (1e6, 0)) # thrusting into the wall
+        instance.update(0.01)
+        assert len(instance.game_world.contacts) == 1
+    assert instance.ship_status.column("health")[ship] == health
+    instance.close()
+
+
+def test_impact_deals_damage():
+    """ramming the wall hurts, more the faster the ship was going"""
+    damage = []
+    for speed in (5, 20):
+        instance, ship = _ship_against_wall(speed)
+        health = instance.ship_status.column("health")[ship]
+        instance.update(0.01)
+        damage.append(health - instance.ship_status.column("health")[ship])
+        instance.close()
+    assert 0 < damage[0] < damage[1]
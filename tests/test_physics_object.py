@@ -0,0 +1,48 @@
+"""Tests for physics objects attached to a game world's body_state"""
+import math
+from game.game_world import game_world
+from math_lib.vector2 import vector2
+from physics.physics_object import physics_object, collider
+
+
+def _spawned() -> tuple[game_world, physics_object]:
+    world = game_world(world_size=100, asteroid_amount=0, asteroid_size_mean=1, asteroid_size_stddev=0)
+    obj = physics_object(mass=1, position=vector2(1, 2), velocity=vector2(3, 0), phys_collider=collider(radius=1))
+    world.spawn(obj)
+    return world, obj
+
+
+def test_in_place_edits_write_through():
+    """mutating the returned vectors changes the stored state"""
+    world, obj = _spawned()
+    obj.position.x = 5
+    obj.position.y += 1
+    obj.velocity.rotate_rad(math.pi / 2)
+    row = world.row_of(obj.handle)
+    assert tuple(world.body_state.column("position")[row]) == (5, 3)
+    velocity = world.body_state.column("velocity")[row]
+    assert math.isclose(velocity[0], 0, abs_tol=1e-12) and math.isclose(velocity[1], 3)
+
+
+def test_copies_are_detached():
+    """copies and arithmetic results don't write back"""
+    world, obj = _spawned()
+    copy = obj.position.copy()
+    copy.x = 50
+    moved = obj.position + vector2(1, 1)
+    moved.y = 50
+    assert obj.position.to_tuple() == (1, 2)
+    world.update(1.0)
+    assert obj.position.to_tuple() == (4, 2)
+
+
+def test_state_survives_despawn():
+    """after a despawn the object holds its last state again, and edits still stick"""
+    world, obj = _spawned()
+    obj.position.x = 7
+    world.despawn(obj.handle)
+    world.flush_despawns()
+    assert obj.handle is None
+    assert obj.position.to_tuple() == (7, 2)
+    obj.position.y = 9
+    assert obj.position.to_tuple() == (7, 9)
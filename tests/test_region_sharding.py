@@ -0,0 +1,54 @@
+"""Tests for region sharding"""
+import gc
+import os
+import random
+import numpy as np
+import pytest
+from game.gamerunner import game
+from game.headless_runner import run_match
+
+
+def _run(config, ticks:int) -> tuple[np.ndarray, list[np.ndarray]]:
+    """simulate a crowded game, returns the final positions and velocities, and every tick's contacts"""
+    random.seed(5)
+    game_instance = game(config)
+    try:
+        game_instance.ship_status.column("throttle")[:, 0] = 0.5
+        contacts = []
+        for tick in range(ticks):
+            game_instance.update(0.01)
+            contacts.append(game_instance.game_world.contacts.copy())
+            if tick == ticks // 2: # rows move around on despawns
+                world = game_instance.game_world
+                world.despawn(world.physics_objects[7].handle)
+        bodies = game_instance.game_world.body_state
+        return np.concatenate([bodies.column("position"), bodies.column("velocity")], axis=1).copy(), contacts
+    finally:
+        game_instance.close()
+
+
+@pytest.mark.parametrize("workers, tile_size", [(2, 100.0), (3, 40.0)])
+def test_sharded_matches_serial(make_config, workers, tile_size):
+    """sharding only spreads the work, every tick comes out bit for bit the same as without it"""
+    crowded = {"asteroid_amount": 200, "world_radius": 400}
+    serial_state, serial_contacts = _run(make_config(**crowded), ticks=200)
+    state, contacts = _run(make_config(**crowded, shard_workers=workers, shard_tile_size=tile_size), ticks=200)
+    assert sum(len(tick) for tick in serial_contacts) > 0
+    assert np.array_equal(state, serial_state)
+    assert all(np.array_equal(a, b) for a, b in zip(contacts, serial_contacts, strict=True))
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="shared memory isn't backed by /dev/shm here")
+def test_shared_memory_is_released(make_config):
+    """neither finished matches nor games dropped without `close` leave shared memory behind"""
+    def blocks() -> set[str]:
+        return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+    before = blocks()
+    run_match(make_config(shard_workers=2), 0, ticks=20, time_delta=0.01)
+    assert blocks() == before
+    game_instance = game(make_config(shard_workers=2))
+    game_instance.update(0.01)
+    assert blocks() > before
+    del game_instance # no `close`, the allocator's finalizer has to unlink the blocks
+    gc.collect()
+    assert blocks() == before
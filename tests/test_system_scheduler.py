@@ -0,0 +1,45 @@
+"""Tests for the system scheduler"""
+import gc
+import threading
+from game.headless_runner import run_match
+from game.system_scheduler import system_scheduler
+
+
+def _system_threads() -> int:
+    return sum(thread.name.startswith("system") for thread in threading.enumerate())
+
+
+def test_stages_follow_conflicts():
+    """systems only share a stage when they don't touch the same data"""
+    scheduler = system_scheduler()
+    order = []
+    scheduler.add_system("a", lambda _: order.append("a"), writes=("body_state.force",))
+    scheduler.add_system("b", lambda _: order.append("b"), reads=("ship_status",), writes=("despawns",))
+    scheduler.add_system("c", lambda _: order.append("c"), reads=("body_state",), writes=("contacts",))
+    assert [[system.name for system in stage] for stage in scheduler.stages] == [["a", "b"], ["c"]]
+    scheduler.run(0.01)
+    assert order == ["a", "b", "c"]
+
+
+def test_threads_stop_without_close():
+    """a scheduler that is dropped without `close` doesn't leave its threads behind"""
+    before = _system_threads()
+    scheduler = system_scheduler(max_workers=2)
+    scheduler.add_system("a", lambda _: None, writes=("x",))
+    scheduler.add_system("b", lambda _: None, writes=("y",))
+    scheduler.run(0.01)
+    assert _system_threads() > before
+    del scheduler
+    gc.collect()
+    for thread in threading.enumerate():
+        if thread.name.startswith("system"):
+            thread.join(timeout=5)
+    assert _system_threads() == before
+
+
+def test_matches_stop_their_threads(make_config):
+    """headless matches close their game, so tournaments don't pile up threads"""
+    before = _system_threads()
+    for seed in range(3):
+        run_match(make_config(system_threads=2), seed, ticks=5, time_delta=0.01)
+        assert _system_threads() == before